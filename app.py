@@ -2,16 +2,28 @@
 import streamlit as st
 from datetime import datetime
 import json
+import hashlib
+import io
+import time
+import threading
 from collections import Counter, defaultdict
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
-from fetch_articles import fetch_articles
-from process_articles import build_candidates
-from timeline_builder import build_timeline
+from pipeline import stream_pipeline, stream_update, PipelineError
+from timeline_builder import sort_timeline
+from models import warm_up
+import instrumentation
+from config import PIPELINE_CACHE_TTL, PIPELINE_SERVER_URL
+from pipeline_client import stream_job
 
 st.set_page_config(page_title="AI News Orchestrator", layout="wide", initial_sidebar_state="expanded")
 
+# load spaCy / SentenceTransformer in the background while the page renders (no-op once loaded);
+# with a pipeline server the models live there and this app is only a client
+if not PIPELINE_SERVER_URL:
+    warm_up()
+
 # --- small css for nicer cards ---
 st.markdown(
     """
@@ -23,12 +35,177 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+@st.cache_resource
+def pipeline_results():
+    """
+    Finished runs shared across sessions/reruns: (query, max_articles) -> (stored_at, articles, n_candidates, timeline, metrics),
+    plus the lock guarding it (each session runs on its own thread).
+    """
+    return {}, threading.Lock()
+
+
+def cached_result(query, max_articles):
+    results, lock = pipeline_results()
+    with lock:
+        hit = results.get((query, max_articles))
+    if hit and time.time() - hit[0] <= PIPELINE_CACHE_TTL:
+        return hit[1:]
+    return None
+
+
+def store_result(query, max_articles, articles, n_candidates, timeline, metrics):
+    results, lock = pipeline_results()
+    now = time.time()
+    with lock:
+        # drop expired runs so the store stays small
+        for key in [k for k, v in results.items() if now - v[0] > PIPELINE_CACHE_TTL]:
+            results.pop(key, None)
+        results[(query, max_articles)] = (now, articles, n_candidates, timeline, metrics)
+
+
+def render_progress(placeholder, articles, n_candidates, entries):
+    """Live view while the pipeline streams: counts so far plus milestones in date order."""
+    with placeholder.container():
+        st.caption(f"{len(articles)} articles processed • {n_candidates} candidate sentences • {len(entries)} milestones summarized")
+        for t in sort_timeline(entries):
+            st.markdown(f"- **{t.get('date') or 'Undated'}** — {t.get('milestone') or '(no summary)'}")
+
+
+def render_performance(metrics):
+    """Sidebar panel with per-stage timings and counters of the last pipeline run."""
+    with st.sidebar.expander("Performance", expanded=False):
+        if not metrics:
+            st.caption("Run a query to collect timings.")
+            return
+        st.caption(f"Run took {metrics['elapsed_s']:.2f}s • worker-thread spans are summed")
+        rows = [{"stage": name, "calls": s["count"], "total_s": s["total_s"], "max_s": s["max_s"]}
+                for name, s in sorted(metrics["spans"].items(), key=lambda x: -x[1]["total_s"])]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        if metrics["counters"]:
+            st.json(metrics["counters"], expanded=False)
+        for name, text in metrics.get("profiles", {}).items():
+            st.markdown(f"**cProfile: {name}**")
+            st.code(text)
+        st.download_button(
+            "Download metrics JSON",
+            json.dumps(metrics, indent=2),
+            file_name=f"metrics_{datetime.utcnow().date()}.json",
+            mime="application/json",
+        )
+
+
+def content_hash(obj):
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def timeline_chart_data(timeline_key, _timeline):
+    """Evidence count and median confidence per date, cached by timeline hash."""
+    # 1) Count supporting sentences per date
+    date_counter = Counter()
+    date_confidences = defaultdict(list)
+    for t in _timeline:
+        d = t.get("date")
+        # normalize undated to None
+        if d is None or d == "None":
+            continue
+        try:
+            dt = datetime.fromisoformat(d)
+        except Exception:
+            # try parsing common formats
+            try:
+                dt = datetime.strptime(d, "%Y-%m-%d")
+            except Exception:
+                continue
+        # count supporting sentences (evidence)
+        ev_count = len(t.get("supporting_sentences", []))
+        date_counter[dt.date()] += ev_count
+        # for confidence timeline (store confidence per milestone date)
+        try:
+            conf = float(t.get("confidence") or 0.0)
+        except Exception:
+            conf = 0.0
+        date_confidences[dt.date()].append(conf)
+
+    dates_sorted = sorted(date_counter.items(), key=lambda x: x[0])
+    evidence = ([d for d, _ in dates_sorted], [c for _, c in dates_sorted])
+    dates2 = sorted(date_confidences.items(), key=lambda x: x[0])
+    confidence = ([d for d, _ in dates2], [float(sorted(vals)[len(vals)//2]) if vals else 0.0 for _, vals in dates2])
+    return evidence, confidence
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def source_counts(articles_key, _articles):
+    """Article counts per source, cached by article-list hash."""
+    return Counter([a.get("source") or "Unknown" for a in _articles])
+
+
+def figure_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=110)
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def evidence_chart(timeline_key, _evidence):
+    # Chart 1: Milestone evidence counts by date (bar chart)
+    x_dates, y_counts = _evidence
+    fig1, ax1 = plt.subplots(figsize=(8, 3.2))
+    ax1.bar(x_dates, y_counts)
+    ax1.set_title("Supporting evidence (quotes) per date")
+    ax1.set_ylabel("Number of supporting quotes")
+    ax1.set_xlabel("Date")
+    # format x-axis dates
+    ax1.xaxis.set_major_locator(mdates.AutoDateLocator())
+    ax1.xaxis.set_major_formatter(mdates.ConciseDateFormatter(mdates.AutoDateLocator()))
+    fig1.tight_layout()
+    return figure_png(fig1)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def confidence_chart(timeline_key, _confidence):
+    # Chart 2: Confidence scatter over time (median confidence per date)
+    x2, median_conf = _confidence
+    fig2, ax2 = plt.subplots(figsize=(8, 3.2))
+    ax2.scatter(x2, median_conf)
+    ax2.set_ylim(-0.05, 1.05)
+    ax2.set_ylabel("Median confidence (0-1)")
+    ax2.set_xlabel("Date")
+    ax2.set_title("Median milestone confidence by date")
+    ax2.xaxis.set_major_locator(mdates.AutoDateLocator())
+    ax2.xaxis.set_major_formatter(mdates.ConciseDateFormatter(mdates.AutoDateLocator()))
+    fig2.tight_layout()
+    return figure_png(fig2)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def source_chart(articles_key, _src_counts):
+    # Chart 3: Source distribution (bar chart)
+    items = sorted(_src_counts.items(), key=lambda x: x[1], reverse=True)
+    labels = [it[0] for it in items]
+    counts = [it[1] for it in items]
+
+    fig3, ax3 = plt.subplots(figsize=(6, 3.2))
+    ax3.bar(labels, counts)
+    ax3.set_title("Article counts by source")
+    ax3.set_ylabel("Number of articles")
+    ax3.set_xticks(range(len(labels)))
+    ax3.set_xticklabels(labels, rotation=40, ha='right')
+    fig3.tight_layout()
+    return figure_png(fig3)
+
+
 # ----- Sidebar -----
 with st.sidebar:
     st.title("📰 News Orchestrator")
     query = st.text_input("Event / Query", value="OpenAI GPT-5 Launch")
-    max_articles = st.slider("Max articles", min_value=3, max_value=30, value=12)
+    max_articles = st.slider("Max articles", min_value=3, max_value=200, value=12)
     min_conf_pct = st.slider("Min confidence %", min_value=0, max_value=100, value=25)
+    track_event = st.checkbox("Track event (incremental updates)", value=False,
+                              help="Keep this query's clusters and summaries; later runs only process newly published articles.")
+    profile_stage = st.selectbox("Profile stage (cProfile)", ["(none)"] + instrumentation.STAGES, index=0)
     run_btn = st.button("Generate Timeline", type="primary")
     st.markdown("---")
     if st.button("Export last timeline"):
@@ -53,37 +230,53 @@ timeline = []
 
 # Run pipeline when requested
 if run_btn:
-    # Fetch articles
-    with st.spinner("Fetching articles..."):
-        try:
-            articles = fetch_articles(query, limit=max_articles)
-        except Exception as e:
-            st.error(f"Error fetching articles: {e}")
-            articles = []
-
-    st.success(f"Fetched {len(articles)} articles")
-
-    # Extract candidates
-    with st.spinner("Extracting candidate statements..."):
-        try:
-            candidates = build_candidates(articles)
-        except Exception as e:
-            st.error(f"Error processing articles: {e}")
-            candidates = []
-
-    st.info(f"Found {len(candidates)} candidate sentences (possible milestones).")
+    cached = None if track_event else cached_result(query, max_articles)
+    if cached:
+        articles, n_candidates, timeline, metrics = cached
+    else:
+        live = st.empty()
+        # this run's own recorder: other sessions running at the same time don't touch it
+        with instrumentation.recording(profile_stage=None if profile_stage == "(none)" else profile_stage) as recorder:
+            articles, n_candidates, entries, metrics = [], 0, [], None
+            try:
+                with st.spinner("Fetching articles, extracting candidates and building timeline..."):
+                    # milestones are shown as soon as each one is summarized
+                    if PIPELINE_SERVER_URL:
+                        events = stream_job(query, max_articles, incremental=track_event)
+                    elif track_event:
+                        events = stream_update(query, max_articles)
+                    else:
+                        events = stream_pipeline(query, max_articles)
+                    for event, payload in events:
+                        if event == "articles":
+                            articles.extend(payload)
+                        elif event == "candidates":
+                            n_candidates += len(payload)
+                        elif event == "entry":
+                            entries.append(payload)
+                        elif event == "metrics":
+                            metrics = payload
+                        render_progress(live, articles, n_candidates, entries)
+                timeline = sort_timeline(entries)
+                metrics = metrics or recorder.snapshot()
+                if not track_event:
+                    store_result(query, max_articles, articles, n_candidates, timeline, metrics)
+            except PipelineError as e:
+                st.error(str(e))
+                timeline = []
+                metrics = recorder.snapshot()
+        live.empty()
 
-    # Build timeline
-    with st.spinner("Building timeline (clustering + LLM summarization)..."):
-        try:
-            timeline = build_timeline(candidates)
-        except Exception as e:
-            st.error(f"Error building timeline: {e}")
-            timeline = []
+    st.success(f"Fetched {len(articles)} {'new ' if track_event else ''}articles")
+    st.info(f"Found {n_candidates} candidate sentences (possible milestones).")
 
     # Save for export / reuse
     st.session_state["last_timeline"] = timeline
     st.session_state["last_articles"] = articles
+    st.session_state["last_metrics"] = metrics
+    # chart cache keys: hashed once per run, not on every rerun (articles carry full text)
+    st.session_state["last_timeline_key"] = content_hash(timeline) if timeline else None
+    st.session_state["last_articles_key"] = content_hash(articles) if articles else None
 
 # If we have cached timeline from previous run, use it for charts
 if not timeline and "last_timeline" in st.session_state:
@@ -91,18 +284,19 @@ if not timeline and "last_timeline" in st.session_state:
 if not articles and "last_articles" in st.session_state:
     articles = st.session_state["last_articles"]
 
+timeline_key = st.session_state.get("last_timeline_key")
+articles_key = st.session_state.get("last_articles_key")
+
 # Sidebar: show top sources
 if articles:
     st.sidebar.markdown("---")
     st.sidebar.header("Top sources")
-    source_counts = {}
-    for a in articles:
-        s = a.get("source") or "Unknown"
-        source_counts[s] = source_counts.get(s, 0) + 1
-    for s, cnt in sorted(source_counts.items(), key=lambda x: -x[1]):
+    for s, cnt in sorted(source_counts(articles_key, articles).items(), key=lambda x: -x[1]):
         badge = "🟢" if cnt >= 2 else "🟡"
         st.sidebar.markdown(f"- {badge} **{s}** — {cnt} article(s)")
 
+render_performance(st.session_state.get("last_metrics"))
+
 # --- Layout: left columns for timeline + charts, right column for details ---
 left, right = st.columns([2, 1])
 
@@ -144,81 +338,15 @@ with left:
     st.header("Charts")
 
     if timeline:
-        # Prepare data for charts
-        # 1) Count supporting sentences per date
-        date_counter = Counter()
-        date_confidences = defaultdict(list)
-        for t in timeline:
-            d = t.get("date")
-            # normalize undated to None
-            if d is None or d == "None":
-                continue
-            try:
-                dt = datetime.fromisoformat(d)
-            except Exception:
-                # try parsing common formats
-                try:
-                    dt = datetime.strptime(d, "%Y-%m-%d")
-                except Exception:
-                    continue
-            # count supporting sentences (evidence)
-            ev_count = len(t.get("supporting_sentences", []))
-            date_counter[dt.date()] += ev_count
-            # for confidence timeline (store confidence per milestone date)
-            try:
-                conf = float(t.get("confidence") or 0.0)
-            except Exception:
-                conf = 0.0
-            date_confidences[dt.date()].append(conf)
-
-        # Chart 1: Milestone evidence counts by date (bar chart)
-        if date_counter:
-            dates_sorted = sorted(date_counter.items(), key=lambda x: x[0])
-            x_dates = [d for d, _ in dates_sorted]
-            y_counts = [c for _, c in dates_sorted]
-
-            fig1, ax1 = plt.subplots(figsize=(8, 3.2))
-            ax1.bar(x_dates, y_counts)
-            ax1.set_title("Supporting evidence (quotes) per date")
-            ax1.set_ylabel("Number of supporting quotes")
-            ax1.set_xlabel("Date")
-            # format x-axis dates
-            ax1.xaxis.set_major_locator(mdates.AutoDateLocator())
-            ax1.xaxis.set_major_formatter(mdates.ConciseDateFormatter(mdates.AutoDateLocator()))
-            fig1.tight_layout()
-            st.pyplot(fig1)
-
-        # Chart 2: Confidence scatter over time (median confidence per date)
-        if date_confidences:
-            dates2 = sorted(date_confidences.items(), key=lambda x: x[0])
-            x2 = [d for d, _ in dates2]
-            median_conf = [float(sorted(vals)[len(vals)//2]) if vals else 0.0 for _, vals in dates2]
-
-            fig2, ax2 = plt.subplots(figsize=(8, 3.2))
-            ax2.scatter(x2, median_conf)
-            ax2.set_ylim(-0.05, 1.05)
-            ax2.set_ylabel("Median confidence (0-1)")
-            ax2.set_xlabel("Date")
-            ax2.set_title("Median milestone confidence by date")
-            ax2.xaxis.set_major_locator(mdates.AutoDateLocator())
-            ax2.xaxis.set_major_formatter(mdates.ConciseDateFormatter(mdates.AutoDateLocator()))
-            fig2.tight_layout()
-            st.pyplot(fig2)
-
-        # Chart 3: Source distribution (bar chart)
-        src_counts = Counter([a.get("source") or "Unknown" for a in articles])
-        if src_counts:
-            items = sorted(src_counts.items(), key=lambda x: x[1], reverse=True)
-            labels = [it[0] for it in items]
-            counts = [it[1] for it in items]
-
-            fig3, ax3 = plt.subplots(figsize=(6, 3.2))
-            ax3.bar(labels, counts)
-            ax3.set_title("Article counts by source")
-            ax3.set_ylabel("Number of articles")
-            ax3.set_xticklabels(labels, rotation=40, ha='right')
-            fig3.tight_layout()
-            st.pyplot(fig3)
+        # chart data and rendered figures are cached by timeline / article hash,
+        # so widget interactions that don't change the data skip matplotlib entirely
+        evidence, confidence = timeline_chart_data(timeline_key, timeline)
+        if evidence[0]:
+            st.image(evidence_chart(timeline_key, evidence))
+        if confidence[0]:
+            st.image(confidence_chart(timeline_key, confidence))
+        if articles:
+            st.image(source_chart(articles_key, source_counts(articles_key, articles)))
     else:
         st.info("Generate a timeline to see charts here.")
 
@@ -0,0 +1,148 @@
+# batch.py
+# Headless batch runner: many queries through one process with warm, shared models.
+#
+#   python batch.py queries.jsonl timelines.jsonl --workers 4
+#
+# Input lines are {"query": "...", "max_articles": 20, "id": "..."} ("max_articles" and "id"
+# optional) or a bare JSON string. Each finished query is appended to the output as one JSON
+# line; re-running with the same output file skips queries that already succeeded.
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import instrumentation
+import models
+from config import MAX_ARTICLES
+from pipeline import stream_pipeline, stream_update, PipelineError
+from timeline_builder import sort_timeline
+
+
+def read_queries(path, default_max_articles=MAX_ARTICLES):
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"query": item}
+            if not item.get("query"):
+                raise ValueError(f"{path}:{lineno}: missing 'query'")
+            item.setdefault("max_articles", default_max_articles)
+            item.setdefault("id", f"{item['query']}|{item['max_articles']}")
+            jobs.append(item)
+    return jobs
+
+
+def completed_ids(path):
+    """Ids already written with status "ok" (failed queries are retried on resume)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line from an interrupted run
+            if rec.get("status") == "ok":
+                done.add(rec.get("id"))
+    return done
+
+
+def run_query(job, incremental=False):
+    """Run one query; returns the output record including per-stage wall-clock timings."""
+    start = time.perf_counter()
+    timings = {}
+    articles, n_candidates, entries = 0, 0, []
+    record = {"id": job["id"], "query": job["query"], "max_articles": job["max_articles"]}
+    try:
+        run = stream_update if incremental else stream_pipeline
+        for event, payload in run(job["query"], job["max_articles"]):
+            now = time.perf_counter() - start
+            if event == "articles":
+                articles += len(payload)
+                timings.setdefault("first_article_s", round(now, 3))
+            elif event == "candidates":
+                n_candidates += len(payload)
+                timings["extraction_done_s"] = round(now, 3)
+            elif event == "entry":
+                entries.append(payload)
+                timings.setdefault("first_entry_s", round(now, 3))
+        record.update(status="ok", timeline=sort_timeline(entries))
+    except PipelineError as e:
+        record.update(status="error", stage=e.stage, error=str(e))
+    except Exception as e:
+        # e.g. sqlite errors from the event store: fail this query, not the batch
+        record.update(status="error", stage="running pipeline", error=f"{type(e).__name__}: {e}")
+    timings["total_s"] = round(time.perf_counter() - start, 3)
+    record.update(n_articles=articles, n_candidates=n_candidates, n_entries=len(entries), timings=timings)
+    return record
+
+
+def print_summary(records, wall, out=sys.stderr):
+    print(f"\n{'query':<40} {'status':<7} {'articles':>8} {'entries':>7} {'total_s':>8}", file=out)
+    for r in records:
+        print(f"{r['query'][:40]:<40} {r['status']:<7} {r['n_articles']:>8} {r['n_entries']:>7} {r['timings']['total_s']:>8.2f}", file=out)
+    totals = [r["timings"]["total_s"] for r in records]
+    if totals:
+        print(f"{len(records)} queries in {wall:.1f}s wall ({sum(totals):.1f}s summed, "
+              f"{sum(totals) / len(totals):.2f}s mean, {max(totals):.2f}s max)", file=out)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run many queries through the pipeline and write timelines as JSONL.")
+    ap.add_argument("input", help="JSONL file of queries")
+    ap.add_argument("output", help="JSONL file to append timelines to (also used for resume)")
+    ap.add_argument("--workers", type=int, default=4, help="queries processed concurrently")
+    ap.add_argument("--max-articles", type=int, default=MAX_ARTICLES, help="default when a line has no max_articles")
+    ap.add_argument("--incremental", action="store_true",
+                    help="update each query's tracked event (only newly published articles are processed)")
+    ap.add_argument("--summary", help="also write the per-query timing summary to this JSON file")
+    args = ap.parse_args(argv)
+
+    jobs = read_queries(args.input, args.max_articles)
+    done = completed_ids(args.output)
+    todo = [j for j in jobs if j["id"] not in done]
+    print(f"{len(jobs)} queries, {len(jobs) - len(todo)} already done, {len(todo)} to run", file=sys.stderr)
+    if not todo:
+        return 0
+
+    # load spaCy + SentenceTransformer once; every worker thread shares them
+    models.warm_up(background=False)
+    instrumentation.reset()
+
+    write_lock = threading.Lock()
+    records = []
+    start = time.perf_counter()
+    with open(args.output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(run_query, job, args.incremental) for job in todo]
+        for fut in as_completed(futures):
+            rec = fut.result()
+            with write_lock:
+                out.write(json.dumps(rec) + "\n")
+                out.flush()
+            records.append(rec)
+            print(f"[{len(records)}/{len(todo)}] {rec['status']} {rec['query']!r} {rec['timings']['total_s']:.2f}s", file=sys.stderr)
+    wall = time.perf_counter() - start
+
+    print_summary(records, wall)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump({
+                "wall_s": round(wall, 3),
+                # spans and counters summed over every query in this run
+                "metrics": instrumentation.snapshot(),
+                "queries": [{k: r[k] for k in ("id", "query", "status", "n_articles", "n_candidates", "n_entries", "timings")}
+                            for r in records],
+            }, f, indent=2)
+    return 0 if all(r["status"] == "ok" for r in records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# benchmarks/corpus.py
+# Deterministic synthetic news corpus: NewsAPI-shaped metadata plus article HTML pages.
+import json
+import random
+from datetime import date, datetime, timedelta
+
+SOURCES = ["TechCrunch", "The Verge", "Reuters", "AP News", "Wired", "Ars Technica", "BBC News", "RandomSite"]
+SUBJECTS = ["OpenAI", "The company", "Regulators", "Analysts", "Developers", "Microsoft", "Competitors", "Investors"]
+EVENTS = [
+    "announced GPT-5 with new multimodal capabilities",
+    "released a developer preview of the new model",
+    "confirmed the rollout to enterprise customers",
+    "reported record usage after the launch",
+    "launched a cheaper tier for small businesses",
+    "said the model would reach Europe later",
+    "claimed the system outperformed earlier versions",
+    "rolled out safety updates to the assistant",
+]
+FILLER = [
+    "The update follows months of speculation across the industry.",
+    "Pricing details were not disclosed in the statement.",
+    "Several partners have already integrated the system into their products.",
+    "Critics argue that benchmarks do not capture real-world reliability.",
+    "The announcement drew attention from policymakers and researchers alike.",
+    "Shares of related companies moved sharply during afternoon trading.",
+]
+DATE_PHRASES = ["on {d:%B} {d.day}, {d.year}", "on {d:%b} {d.day}", "earlier this week", "last month", "yesterday", "in {d:%B} {d.year}"]
+
+PAGE = """<!doctype html>
+<html><head><title>{title}</title>
+<script>window.analytics = {{ track: function() {{}} }};</script>
+<style>body {{ font-family: sans-serif; }}</style></head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/tech">Tech</a> <a href="/business">Business</a></nav></header>
+<aside><p>Subscribe to our newsletter for daily updates.</p></aside>
+<article>
+<h1>{title}</h1>
+{paragraphs}
+</article>
+<footer><p>Copyright {year} {source}. All rights reserved.</p></footer>
+</body></html>
+"""
+
+
+def make_corpus(n_articles, seed=0, base_date=date(2025, 2, 1), paragraphs=(4, 9)):
+    """Return a list of article dicts with "title", "source", "published_at" and "html"."""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n_articles):
+        source = rng.choice(SOURCES)
+        published = base_date + timedelta(days=rng.randint(0, 60))
+        title = f"{rng.choice(SUBJECTS)} {rng.choice(EVENTS)}"
+        paras = []
+        for _ in range(rng.randint(*paragraphs)):
+            event_day = published - timedelta(days=rng.randint(0, 10))
+            sentences = [
+                f"{rng.choice(SUBJECTS)} {rng.choice(EVENTS)} {rng.choice(DATE_PHRASES).format(d=event_day)}.",
+                rng.choice(FILLER),
+                rng.choice(FILLER),
+            ]
+            rng.shuffle(sentences)
+            paras.append("<p>" + " ".join(sentences) + "</p>")
+        articles.append({
+            "title": title,
+            "source": source,
+            "published_at": datetime.combine(published, datetime.min.time()).isoformat() + "Z",
+            "html": PAGE.format(title=title, paragraphs="\n".join(paras), year=published.year, source=source),
+        })
+    return articles
+
+
+def make_heavy_page(article, seed=0, links=300, related=60, comments=40, script_kb=60):
+    """
+    Wrap a corpus article in the bulk of a real news page: large inline script
+    state, mega-menu navigation, related-story lists, a comment thread and
+    inline markup inside paragraphs. Used as HTML extraction fixtures.
+    """
+    rng = random.Random(seed)
+    state = {"articles": [{"id": i, "headline": rng.choice(EVENTS), "tags": rng.sample(SUBJECTS, 3)} for i in range(script_kb * 8)]}
+    nav = "".join(f'<li><a href="/section/{i}" class="nav-link">{rng.choice(SUBJECTS)} {i}</a></li>' for i in range(links))
+    rel = "".join(f'<li><a href="/story/{i}"><img src="/img/{i}.jpg" alt=""><span>{rng.choice(SUBJECTS)} {rng.choice(EVENTS)}</span></a></li>'
+                  for i in range(related))
+    comm = "".join(f'<div class="comment"><p><b>user{i}</b> {rng.choice(FILLER)}</p></div>' for i in range(comments))
+    body = article["html"].split("<article>", 1)[1].split("</article>", 1)[0]
+    # inline markup the way CMSes emit it
+    body = body.replace("The update", '<a href="/topic/update"><em>The update</em></a>').replace("Pricing", "<strong>Pricing</strong>")
+    return f"""<!doctype html>
+<html lang="en"><head><meta charset="utf-8"><title>{article['title']}</title>
+<script>window.__STATE__ = {json.dumps(state)};</script>
+<style>{'.c{color:#333;margin:0 auto;padding:4px}' * 400}</style></head>
+<body>
+<header><div class="top"><nav><ul>{nav}</ul></nav></div></header>
+<div class="layout"><main>
+<article>
+<div class="byline"><span>{article['source']}</span> <time>{article['published_at']}</time></div>
+{body}
+</article>
+<section class="comments">{comm}</section>
+</main>
+<aside><h3>Related</h3><ul>{rel}</ul><p>Subscribe to our newsletter for daily updates.</p></aside></div>
+<footer><nav><ul>{nav[:len(nav) // 4]}</ul></nav><p>Copyright {article['source']}.</p></footer>
+<script>{'(function(){var a=1;})();' * 500}</script>
+</body></html>
+"""
@@ -0,0 +1,84 @@
+# benchmarks/embed_bench.py
+# Embedding throughput: the original `embed_model.encode(sentences, show_progress_bar=True)` call vs.
+# embedding_engine.EmbeddingEngine (length buckets, tuned batch size, capped threads, normalized output).
+#
+#   python benchmarks/embed_bench.py --sentences 2000
+#   python benchmarks/embed_bench.py --sentences 2000 --threads 2 --batch-size 64
+#
+# Requires the SentenceTransformer model. Also reports bytes per vector and the
+# worst-case cosine error of the float16 / int8 embedding-cache storage modes.
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus import make_corpus  # noqa: E402
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def make_sentences(n, seed=0):
+    """Corpus sentences with a realistic length spread (single sentences up to short paragraphs)."""
+    rng = random.Random(seed)
+    pool = []
+    for art in make_corpus(max(10, n // 20), seed=seed):
+        for para in re.findall(r"<p>(.*?)</p>", art["html"]):
+            pool.extend(s.strip() + "." for s in TAG_RE.sub("", para).split(". ") if s.strip())
+    return [" ".join(rng.choice(pool) for _ in range(rng.choice((1, 1, 1, 2, 3, 5)))) for _ in range(n)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Embedding throughput: original encode call vs. EmbeddingEngine.")
+    ap.add_argument("--sentences", type=int, default=2000)
+    ap.add_argument("--batch-size", default="auto", help='engine batch size, or "auto"')
+    ap.add_argument("--threads", type=int, default=None, help="engine thread cap (default: EMBED_THREADS)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    import models
+    from config import EMBED_THREADS
+    from embedding_cache import STORAGE, encode_vectors, decode_vectors
+    from embedding_engine import EmbeddingEngine, normalize
+
+    sentences = make_sentences(args.sentences, args.seed)
+    model = models.get_embed_model()
+    model.encode(sentences[:32], show_progress_bar=False)   # warm-up
+    print(f"{len(sentences)} sentences, mean {np.mean([len(s) for s in sentences]):.0f} chars")
+
+    baseline, t_base = timed(lambda: model.encode(sentences, show_progress_bar=True))
+    print(f"  {'original encode()':<24} {len(sentences) / t_base:>9.1f} sentences/s")
+
+    threads = EMBED_THREADS if args.threads is None else args.threads
+    engine = EmbeddingEngine(model, batch_size=args.batch_size, threads=threads)
+    if engine.batch_size is None:
+        _, t_tune = timed(lambda: engine.tune(sentences))
+        print(f"  tuned batch size {engine.batch_size} in {t_tune:.1f}s: {engine.tune_results}")
+    vectors, t_engine = timed(lambda: engine.encode(sentences))
+    print(f"  {'EmbeddingEngine':<24} {len(sentences) / t_engine:>9.1f} sentences/s   "
+          f"{t_base / t_engine:.2f}x   (threads={threads}, batch_size={engine.batch_size})")
+
+    expected = normalize(baseline)
+    print(f"  max |cosine difference| vs original: {np.abs(np.sum(expected * vectors, axis=1) - 1).max():.2e}")
+
+    dim = vectors.shape[1]
+    for storage, (dtype, _) in STORAGE.items():
+        decoded = decode_vectors(encode_vectors(vectors, storage), storage)
+        err = np.abs(np.sum(decoded * vectors, axis=1) - np.sum(vectors * vectors, axis=1)).max()
+        print(f"  storage {storage:<8} {dim * np.dtype(dtype).itemsize:>6} bytes/vector   max cosine error {err:.2e}")
+
+
+if __name__ == "__main__":
+    main()
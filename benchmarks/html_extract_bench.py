@@ -0,0 +1,115 @@
+# benchmarks/html_extract_bench.py
+# Micro-benchmark of article text extraction over saved HTML pages: the original
+# BeautifulSoup extractor vs. fetch_articles.text_from_html (stdlib one-pass parser, and lxml when installed).
+#
+#   python benchmarks/html_extract_bench.py                       # benchmarks/fixtures/*.html
+#   python benchmarks/html_extract_bench.py --fixtures saved_pages/ --repeat 20
+#
+# Any saved page works as a fixture (e.g. `curl -o saved_pages/x.html <article url>`).
+# The bundled fixtures were generated with corpus.make_heavy_page.
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fetch_articles  # noqa: E402
+
+WORD_RE = re.compile(r"\w+")
+
+
+def legacy_text_from_html(html):
+    """fetch_articles.text_from_html before the one-pass rewrite (BeautifulSoup tree, get_text per <p>)."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "aside", "nav", "footer", "form", "header", "noscript"]):
+        tag.decompose()
+    main = soup.find("article") or soup.find("main")
+    if main:
+        paragraphs = main.find_all("p")
+    else:
+        paragraphs = soup.find_all("p")
+    text_blocks = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
+    text = "\n\n".join(text_blocks).strip()
+    if not text:
+        body = soup.body
+        text = body.get_text(separator="\n", strip=True) if body else ""
+    return text
+
+
+def stdlib_text_from_html(html):
+    parser = fetch_articles.ParagraphParser()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+def extractors():
+    found = {"legacy (bs4)": legacy_text_from_html, "one-pass (stdlib)": stdlib_text_from_html}
+    if fetch_articles.lxml_html is not None:
+        found["one-pass (lxml)"] = fetch_articles.text_from_html_lxml
+    return found
+
+
+def word_overlap(a, b):
+    """Jaccard similarity of the two texts' word sets (1.0 = same words)."""
+    wa, wb = set(WORD_RE.findall(a.lower())), set(WORD_RE.findall(b.lower()))
+    return len(wa & wb) / len(wa | wb) if wa | wb else 1.0
+
+
+def bench(fn, pages, repeat, track_memory):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            fn(html)
+        times.append(time.perf_counter() - start)
+    stats = {"ms_per_page": round(1000 * statistics.median(times) / len(pages), 3)}
+    if track_memory:
+        tracemalloc.start()
+        for html in pages:
+            fn(html)
+        stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare HTML text extractors on saved pages.")
+    ap.add_argument("--fixtures", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"),
+                    help="directory of saved *.html pages")
+    ap.add_argument("--repeat", type=int, default=10, help="timed passes over all pages (median is reported)")
+    ap.add_argument("--memory", action="store_true", help="also report peak Python memory of one pass")
+    args = ap.parse_args(argv)
+
+    paths = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+    if not paths:
+        ap.error(f"no *.html fixtures in {args.fixtures}")
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            pages.append(f.read().decode("utf-8", errors="replace"))
+    total_kb = sum(len(p) for p in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KB total, {args.repeat} passes")
+
+    found = extractors()
+    reference = [legacy_text_from_html(p) for p in pages]
+    base = None
+    for name, fn in found.items():
+        stats = bench(fn, pages, args.repeat, args.memory)
+        overlap = statistics.mean(word_overlap(fn(p), ref) for p, ref in zip(pages, reference))
+        base = base or stats["ms_per_page"]
+        line = f"  {name:<20} {stats['ms_per_page']:>9.2f} ms/page  {base / stats['ms_per_page']:>6.1f}x"
+        if "peak_mb" in stats:
+            line += f"  {stats['peak_mb']:>7.1f} MB peak"
+        print(line + f"  word overlap vs legacy {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/import_time.py
+# Startup-latency benchmark: cold import time of each pipeline module (fresh interpreter per sample)
+# and, optionally, first-use model load time.
+#
+#   python benchmarks/import_time.py --repeat 5 --out import_times.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["config", "fetch_articles", "process_articles", "timeline_builder"]
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+MODELS_SNIPPET = (
+    "import time, models; t = time.perf_counter(); models.warm_up(background=False); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def run_snippet(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure(code, repeat):
+    samples = [run_snippet(code) for _ in range(repeat)]
+    return {
+        "median_s": round(statistics.median(samples), 4),
+        "min_s": round(min(samples), 4),
+        "max_s": round(max(samples), 4),
+        "samples": len(samples),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure cold import and model load times.")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--modules", nargs="*", default=MODULES)
+    ap.add_argument("--models", action="store_true", help="also time loading spaCy + SentenceTransformer")
+    ap.add_argument("--out", help="write results as JSON to this path")
+    args = ap.parse_args()
+
+    results = {"python": sys.version.split()[0], "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "imports": {}}
+    for module in args.modules:
+        results["imports"][module] = measure(IMPORT_SNIPPET.format(module=module), args.repeat)
+        print(f"import {module:<18} {results['imports'][module]['median_s']:.3f}s")
+    if args.models:
+        results["model_warm_up"] = measure(MODELS_SNIPPET, args.repeat)
+        print(f"model warm-up           {results['model_warm_up']['median_s']:.3f}s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# benchmarks/pipeline_bench.py
+# Offline end-to-end benchmark: local NewsAPI/article stub server, synthetic corpus, fake LLM.
+# Reports wall time (and, with --memory, peak Python memory) per stage and writes the results as JSON.
+#
+#   python benchmarks/pipeline_bench.py --sizes 10 100 1000 --out bench.json
+#   python benchmarks/pipeline_bench.py --sizes 100 --baseline bench.json   # print deltas vs. an earlier run
+#
+# tracemalloc slows allocation-heavy stages (dateparser, spaCy) several-fold, so compare
+# timings only between runs made with the same --memory setting.
+#
+# Requires the real spaCy model and SentenceTransformer; the network, publishers and the LLM
+# are all replaced by local stand-ins, and on-disk caches are disabled so every run is cold.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# must be set before the pipeline modules read config.py
+os.environ.setdefault("NEWS_CACHE_DIR", tempfile.mkdtemp(prefix="news-bench-"))
+os.environ.setdefault("ARTICLE_CACHE_ENABLED", "0")
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "0")
+os.environ.setdefault("SUMMARY_CACHE_ENABLED", "0")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LLM_REQUESTS_PER_MIN", "1000000")
+os.environ.setdefault("FETCH_DEADLINE", "600")
+os.environ.setdefault("NEWSAPI_REQUESTS_PER_MIN", "1000000")
+
+from corpus import make_corpus  # noqa: E402
+from stub_server import StubNewsServer  # noqa: E402
+
+STAGES = ["fetch", "sentence_split", "ner", "date_parse", "embed", "cluster", "summarize"]
+
+
+def measure(fn, track_memory=True):
+    """Run fn() and return (result, {"seconds", "peak_mb"})."""
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    stats = {"seconds": round(elapsed, 4)}
+    if track_memory:
+        stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    return result, stats
+
+
+def run_size(n_articles, llm_latency, track_memory, seed=0):
+    import fetch_articles
+    import instrumentation
+    import process_articles
+    import models
+    from config import FETCH_WORKERS
+    from date_resolver import DateResolver
+    from llm_client import FakeLLMBackend
+    from timeline_builder import cluster_candidates, iter_cluster_summaries
+
+    corpus = make_corpus(n_articles, seed=seed)
+    # pay model loads and lazy imports (dateparser, sklearn) before any stage is timed
+    models.warm_up(background=False)
+    nlp = models.get_nlp()
+    warm = DateResolver()
+    for phrase in ("January 1, 2020", "yesterday", "last month", "on Feb 3"):
+        warm.resolve(phrase, "2025-02-18T00:00:00Z")
+    cluster_candidates([{"embedding": [0.0, 1.0]}, {"embedding": [1.0, 0.0]}, {"embedding": [1.0, 1.0]}])
+    process_articles.date_resolver = DateResolver()  # cold date cache per run
+    instrumentation.reset(profile_stage=None)
+    stages = {}
+    with StubNewsServer(corpus) as server:
+        fetch_articles.NEWSAPI_URL = server.newsapi_url
+
+        def fetch():
+            raw = fetch_articles.search_newsapi("benchmark", n_articles)
+            # every stub article lives on one host, so lift the per-host cap
+            return fetch_articles.enrich_with_full_text(raw, per_host=FETCH_WORKERS, cache=None)
+
+        articles, stages["fetch"] = measure(fetch, track_memory)
+
+    texts = [a.get("content") or "" for a in articles]
+    ner_pipes = [p for p in ("ner",) if p in nlp.pipe_names]
+    docs, stages["sentence_split"] = measure(lambda: list(nlp.pipe(texts, disable=ner_pipes)), track_memory)
+    if ner_pipes:
+        ner = nlp.get_pipe("ner")
+        docs, stages["ner"] = measure(lambda: list(ner.pipe(docs)), track_memory)
+    candidates, stages["date_parse"] = measure(lambda: process_articles.candidates_from_docs(articles, docs), track_memory)
+    candidates, stages["embed"] = measure(lambda: process_articles.embed_candidates(candidates), track_memory)
+    clusters, stages["cluster"] = measure(lambda: cluster_candidates(candidates), track_memory)
+    backend = FakeLLMBackend(latency=llm_latency)
+    _, stages["summarize"] = measure(lambda: dict(iter_cluster_summaries(clusters, backend=backend)), track_memory)
+
+    return {
+        "articles": n_articles,
+        "counts": {
+            "articles_fetched": len(articles),
+            "sentences": sum(1 for d in docs for _ in d.sents),
+            "candidates": len(candidates),
+            "clusters": len(clusters),
+            "llm_calls": backend.calls,
+        },
+        "date_resolver": process_articles.date_resolver.stats(),
+        "stages": stages,
+        "counters": instrumentation.snapshot()["counters"],
+        "total_seconds": round(sum(s["seconds"] for s in stages.values()), 4),
+    }
+
+
+def print_run(run, baseline=None):
+    print(f"\n== {run['articles']} articles: {run['counts']}")
+    for stage in STAGES:
+        s = run["stages"].get(stage)
+        if not s:
+            continue
+        line = f"  {stage:<15} {s['seconds']:>9.3f}s"
+        if "peak_mb" in s:
+            line += f" {s['peak_mb']:>9.1f} MB"
+        if baseline and stage in baseline["stages"]:
+            before = baseline["stages"][stage]["seconds"]
+            if before:
+                line += f"   {100 * (s['seconds'] - before) / before:+6.1f}% vs baseline"
+        print(line)
+    print(f"  {'total':<15} {run['total_seconds']:>9.3f}s")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline per-stage pipeline benchmark.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="corpus sizes (articles)")
+    ap.add_argument("--llm-latency", type=float, default=0.05, help="simulated seconds per LLM call")
+    ap.add_argument("--memory", action="store_true", help="record peak_mb per stage with tracemalloc (slower)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="earlier results JSON to compare against")
+    args = ap.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r["articles"]: r for r in json.load(f)["runs"]}
+
+    runs = []
+    for size in args.sizes:
+        run = run_size(size, args.llm_latency, args.memory, seed=args.seed)
+        print_run(run, baseline.get(size))
+        runs.append(run)
+
+    results = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "llm_latency": args.llm_latency,
+        "memory_tracked": args.memory,
+        "runs": runs,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
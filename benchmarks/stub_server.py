@@ -0,0 +1,91 @@
+# benchmarks/stub_server.py
+# Local stand-in for newsapi.org and publisher sites, serving a synthetic corpus over HTTP.
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubNewsServer:
+    """
+    Serves /v2/everything in the NewsAPI response shape used by
+    fetch_articles.search_newsapi (honours pageSize and page) and each
+    article's HTML at /articles/<n>.html. Use as a context manager; `base_url`
+    is set once started.
+    """
+
+    def __init__(self, corpus, host="127.0.0.1", port=0):
+        self.corpus = corpus
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self.newsapi_url = self.base_url + "/v2/everything"
+        self._thread = None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type):
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/v2/everything":
+                    qs = parse_qs(url.query)
+                    size = int(qs.get("pageSize", ["100"])[0])
+                    page = int(qs.get("page", ["1"])[0])
+                    self._send(200, json.dumps(stub.newsapi_page(size, page)), "application/json")
+                elif url.path.startswith("/articles/") and url.path.endswith(".html"):
+                    try:
+                        art = stub.corpus[int(url.path[len("/articles/"):-len(".html")])]
+                    except (ValueError, IndexError):
+                        self._send(404, "not found", "text/plain")
+                        return
+                    self._send(200, art["html"], "text/html; charset=utf-8")
+                else:
+                    self._send(404, "not found", "text/plain")
+
+        return Handler
+
+    def article_url(self, i):
+        return f"{self.base_url}/articles/{i}.html"
+
+    def newsapi_page(self, page_size, page=1):
+        start = (page - 1) * page_size
+        items = []
+        for i in range(start, min(start + page_size, len(self.corpus))):
+            art = self.corpus[i]
+            items.append({
+                "source": {"id": None, "name": art["source"]},
+                "title": art["title"],
+                "url": self.article_url(i),
+                "publishedAt": art["published_at"],
+                "content": art["title"] + "… [+1200 chars]",
+            })
+        return {"status": "ok", "totalResults": len(self.corpus), "articles": items}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,181 @@
+# candidates.py
+# Columnar candidate sentences: one float32 embedding matrix and flat columns instead of a dict per sentence.
+from collections.abc import Mapping
+from datetime import date
+import numpy as np
+from dateutil.parser import parse as parse_dt
+
+NO_DATE = 0   # ordinal stored when a sentence has no resolved date
+ARTICLE_FIELDS = ("article_url", "article_title", "article_source", "article_published")
+FIELDS = ARTICLE_FIELDS + ("sentence", "date_mentioned", "embedding", "duplicates")
+
+
+def date_ordinal(value):
+    """Ordinal of an ISO date/datetime string (NO_DATE when missing or unparseable)."""
+    if not value:
+        return NO_DATE
+    try:
+        return date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        try:
+            return parse_dt(value).date().toordinal()
+        except Exception:
+            return NO_DATE
+
+
+class ArticleTable:
+    """Per-article provenance shared by all of an article's candidates (one row per article)."""
+
+    def __init__(self):
+        self.rows = []          # (url, title, source, published_at)
+        self.published = []     # publish-date ordinals
+        self._index = {}
+
+    def add(self, url, title, source, published):
+        key = (url, title, source, published)
+        i = self._index.get(key)
+        if i is None:
+            i = self._index[key] = len(self.rows)
+            self.rows.append(key)
+            self.published.append(date_ordinal(published))
+        return i
+
+    def add_article(self, art):
+        return self.add(art.get("url"), art.get("title"), art.get("source"), art.get("published_at"))
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class CandidateRow(Mapping):
+    """Read-only dict view of one candidate, with the keys of the old per-sentence dicts."""
+
+    __slots__ = ("batch", "i")
+
+    def __init__(self, batch, i):
+        self.batch = batch
+        self.i = i
+
+    def __getitem__(self, key):
+        b, i = self.batch, self.i
+        if key in ARTICLE_FIELDS:
+            return b.articles.rows[b.article_index[i]][ARTICLE_FIELDS.index(key)]
+        if key == "sentence":
+            return b.sentences[i]
+        if key == "date_mentioned":
+            return b.dates[i]
+        if key == "embedding" and b.embeddings is not None:
+            return b.embeddings[i]
+        if key == "duplicates" and b.duplicates[i]:
+            return b.duplicates[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (k for k in FIELDS if k in self)
+
+    def __contains__(self, key):
+        if key == "embedding":
+            return self.batch.embeddings is not None
+        if key == "duplicates":
+            return bool(self.batch.duplicates[self.i])
+        return key in FIELDS
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"CandidateRow({dict(self)!r})"
+
+
+class CandidateBatch:
+    """
+    Candidates as parallel columns:
+      sentences       list of str
+      dates           resolved ISO date per sentence (or None)
+      date_ordinals   int32 array, NO_DATE where no date was resolved
+      article_index   int32 array of rows in `articles` (shared ArticleTable)
+      embeddings      (n, d) float32 matrix, None until embedded
+      duplicates      per-row provenance lists of collapsed near-duplicates
+    Iterating or indexing yields CandidateRow dict views, so code written
+    against the old list of dicts keeps working.
+    """
+
+    def __init__(self, articles=None, sentences=None, dates=None, article_index=None,
+                 embeddings=None, duplicates=None):
+        self.articles = articles if articles is not None else ArticleTable()
+        self.sentences = list(sentences or [])
+        self.dates = list(dates) if dates is not None else [None] * len(self.sentences)
+        self.date_ordinals = np.array([date_ordinal(d) for d in self.dates], dtype=np.int32)
+        self.article_index = np.asarray(article_index if article_index is not None else [], dtype=np.int32)
+        self.embeddings = embeddings
+        # a list object per row, so provenance added later reaches every batch sharing the row
+        self.duplicates = list(duplicates) if duplicates is not None else [[] for _ in self.sentences]
+
+    @classmethod
+    def from_dicts(cls, candidates):
+        """Build a batch from old-style candidate dicts (or CandidateRows)."""
+        if isinstance(candidates, CandidateBatch):
+            return candidates
+        candidates = list(candidates)
+        articles = ArticleTable()
+        index = [articles.add(*(c.get(k) for k in ARTICLE_FIELDS)) for c in candidates]
+        embeddings = None
+        if candidates and all(c.get("embedding") is not None for c in candidates):
+            embeddings = np.vstack([np.asarray(c["embedding"], dtype=np.float32) for c in candidates])
+        return cls(articles, [c.get("sentence") or "" for c in candidates], [c.get("date_mentioned") for c in candidates],
+                   index, embeddings, [list(c.get("duplicates") or []) for c in candidates])
+
+    @classmethod
+    def concat(cls, batches):
+        """One batch from many (article tables are merged)."""
+        batches = [cls.from_dicts(b) for b in batches]
+        batches = [b for b in batches if len(b)]
+        if len(batches) == 1:
+            return batches[0]
+        articles = ArticleTable()
+        sentences, dates, index, duplicates = [], [], [], []
+        for b in batches:
+            remap = np.array([articles.add(*row) for row in b.articles.rows] or [0], dtype=np.int32)
+            sentences += b.sentences
+            dates += b.dates
+            index.append(remap[b.article_index])
+            duplicates += b.duplicates
+        embeddings = None
+        if batches and all(b.embeddings is not None for b in batches):
+            embeddings = np.vstack([b.embeddings for b in batches])
+        return cls(articles, sentences, dates, np.concatenate(index) if index else [], embeddings, duplicates)
+
+    def take(self, indices):
+        """Subset of rows (sharing the article table and each row's duplicates list)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        sub = CandidateBatch(self.articles)
+        sub.sentences = [self.sentences[i] for i in indices]
+        sub.dates = [self.dates[i] for i in indices]
+        sub.date_ordinals = self.date_ordinals[indices]
+        sub.article_index = self.article_index[indices]
+        sub.embeddings = self.embeddings[indices] if self.embeddings is not None else None
+        sub.duplicates = [self.duplicates[i] for i in indices]
+        return sub
+
+    def published_ordinals(self):
+        """Publish-date ordinal of each row's article (NO_DATE when unknown)."""
+        return np.asarray(self.articles.published, dtype=np.int32)[self.article_index] if len(self) else np.zeros(0, np.int32)
+
+    def to_dicts(self):
+        return [dict(row) for row in self]
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return CandidateRow(self, i)
+
+    def __iter__(self):
+        return (CandidateRow(self, i) for i in range(len(self)))
+
+    def __bool__(self):
+        return len(self) > 0
@@ -0,0 +1,105 @@
+# clustering.py
+# Clustering backends for timeline_builder.cluster_candidates.
+# All backends take an (n, d) embedding matrix plus a Euclidean distance threshold and return n integer labels.
+import numpy as np
+from config import CLUSTER_BACKEND, CLUSTER_EXACT_MAX, CLUSTER_KNN_NEIGHBORS
+
+
+def agglomerative_labels(X, distance_threshold):
+    """Exact average-linkage clustering (O(n^2) memory) — the original behaviour."""
+    from sklearn.cluster import AgglomerativeClustering
+    if len(X) < 2:
+        return np.zeros(len(X), dtype=np.int64)
+    clustering = AgglomerativeClustering(n_clusters=None, distance_threshold=distance_threshold, linkage="average")
+    return clustering.fit_predict(X)
+
+
+def leader_labels(X, distance_threshold):
+    """
+    Streaming threshold clusterer with average-linkage semantics.
+    Each cluster keeps only the sum of its vectors and of their squared norms,
+    which gives the mean squared distance from a new point to all members:
+        mean_j |x - c_j|^2 = |x|^2 - 2 x.S/n + Q/n
+    A point joins the closest cluster whose root-mean-square distance is below
+    the threshold (RMS >= mean distance, so the join test is never looser than
+    the average-linkage distance), otherwise it starts a new cluster.
+    Memory is O(n + k*d) for k clusters.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n, d = X.shape
+    labels = np.empty(n, dtype=np.int64)
+    capacity = 64
+    sums = np.zeros((capacity, d), dtype=np.float32)
+    sq_sums = np.zeros(capacity, dtype=np.float64)
+    counts = np.zeros(capacity, dtype=np.int64)
+    k = 0
+    limit = distance_threshold ** 2
+    for i in range(n):
+        x = X[i]
+        xx = float(x @ x)
+        best = -1
+        if k:
+            cnt = counts[:k]
+            msd = xx - 2.0 * (sums[:k] @ x) / cnt + sq_sums[:k] / cnt
+            j = int(np.argmin(msd))
+            if msd[j] < limit:
+                best = j
+        if best == -1:
+            if k == capacity:
+                capacity *= 2
+                sums = np.resize(sums, (capacity, d))
+                sq_sums = np.resize(sq_sums, capacity)
+                counts = np.resize(counts, capacity)
+                sums[k:] = 0
+                sq_sums[k:] = 0
+                counts[k:] = 0
+            best = k
+            k += 1
+        sums[best] += x
+        sq_sums[best] += xx
+        counts[best] += 1
+        labels[i] = best
+    return labels
+
+
+def knn_graph_labels(X, distance_threshold, n_neighbors=CLUSTER_KNN_NEIGHBORS):
+    """
+    Connected components of a sparse nearest-neighbour graph: each point links to
+    at most `n_neighbors` neighbours closer than the threshold (single-linkage
+    style, O(n * n_neighbors) memory).
+    """
+    from sklearn.neighbors import NearestNeighbors
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    X = np.asarray(X, dtype=np.float32)
+    n = len(X)
+    if n < 2:
+        return np.zeros(n, dtype=np.int64)
+    k = min(n_neighbors + 1, n)
+    nn = NearestNeighbors(n_neighbors=k).fit(X)
+    dist, idx = nn.kneighbors(X)
+    mask = dist < distance_threshold
+    rows = np.repeat(np.arange(n), k)[mask.ravel()]
+    cols = idx.ravel()[mask.ravel()]
+    graph = csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+BACKENDS = {
+    "agglomerative": agglomerative_labels,
+    "leader": leader_labels,
+    "knn": knn_graph_labels,
+}
+
+
+def cluster_labels(X, distance_threshold, backend=CLUSTER_BACKEND):
+    """
+    Label each row of X. backend="auto" uses exact agglomerative clustering up to
+    CLUSTER_EXACT_MAX rows and the streaming leader clusterer above that.
+    """
+    if backend == "auto":
+        backend = "agglomerative" if len(X) <= CLUSTER_EXACT_MAX else "leader"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown clustering backend {backend!r}; choose from {sorted(BACKENDS)} or 'auto'")
+    return BACKENDS[backend](X, distance_threshold)
@@ -7,5 +7,81 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "sk-proj-lYsRUV-Yv1obkJyd6JHTaCFamf
 
 # Optional tuning
 MAX_ARTICLES = 12
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 LLM_MODEL = "gpt-5"   # update if you use a different name
+
+# NewsAPI search (fetch_articles.search_newsapi)
+NEWSAPI_PAGE_SIZE = int(os.getenv("NEWSAPI_PAGE_SIZE", "100"))          # NewsAPI caps pageSize at 100
+NEWSAPI_WINDOWS = int(os.getenv("NEWSAPI_WINDOWS", "1"))                # date windows queried in parallel
+NEWSAPI_LOOKBACK_DAYS = int(os.getenv("NEWSAPI_LOOKBACK_DAYS", "28"))   # span split into windows
+NEWSAPI_WORKERS = int(os.getenv("NEWSAPI_WORKERS", "4"))                # concurrent page requests
+NEWSAPI_REQUESTS_PER_MIN = int(os.getenv("NEWSAPI_REQUESTS_PER_MIN", "30"))
+NEWSAPI_MAX_RETRIES = int(os.getenv("NEWSAPI_MAX_RETRIES", "2"))        # retries on 429/5xx
+
+# Full-text enrichment (fetch_articles.enrich_with_full_text)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))        # parallel downloads
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "2"))      # max in-flight requests per host
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "8"))      # per-request deadline (seconds)
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", "30"))   # overall enrichment deadline (seconds)
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))   # article HTML read per page
+
+# On-disk caches
+CACHE_DIR = os.getenv("NEWS_CACHE_DIR", ".cache")
+ARTICLE_CACHE_ENABLED = os.getenv("ARTICLE_CACHE_ENABLED", "1") == "1"
+ARTICLE_CACHE_TTL = float(os.getenv("ARTICLE_CACHE_TTL", str(24 * 3600)))   # seconds before revalidation
+ARTICLE_CACHE_MAX_MB = float(os.getenv("ARTICLE_CACHE_MAX_MB", "200"))
+
+# spaCy candidate extraction (process_articles.build_candidates)
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "32"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+DATE_CACHE_SIZE = int(os.getenv("DATE_CACHE_SIZE", "4096"))     # memoized date strings
+DATE_LANGUAGES = [l for l in os.getenv("DATE_LANGUAGES", "en").split(",") if l]   # NewsAPI is queried with language=en; empty = autodetect
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+
+# Sentence embedding (embedding_engine.EmbeddingEngine)
+EMBED_BATCH_SIZE = os.getenv("EMBED_BATCH_SIZE", "auto")                        # "auto" tunes on first large input
+EMBED_MAX_BATCH_TOKENS = int(os.getenv("EMBED_MAX_BATCH_TOKENS", "8192"))       # padded tokens per batch
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", str(min(4, os.cpu_count() or 1))))   # torch threads; 0 = leave as is
+EMBED_STORAGE = os.getenv("EMBED_STORAGE", "float32")                           # embedding cache: float32 | float16 | int8
+
+# Near-duplicate elimination (process_articles.Deduplicator)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_ARTICLE_THRESHOLD = float(os.getenv("DEDUP_ARTICLE_THRESHOLD", "0.8"))     # est. Jaccard of word 5-grams
+DEDUP_ARTICLE_MIN_WORDS = int(os.getenv("DEDUP_ARTICLE_MIN_WORDS", "50"))        # shorter texts (snippets) are never merged
+DEDUP_SENTENCE_THRESHOLD = float(os.getenv("DEDUP_SENTENCE_THRESHOLD", "0.7"))   # est. Jaccard of word 3-grams
+
+# Clustering (timeline_builder.cluster_candidates)
+CLUSTER_BACKEND = os.getenv("CLUSTER_BACKEND", "auto")   # auto | agglomerative | leader | knn
+CLUSTER_EXACT_MAX = int(os.getenv("CLUSTER_EXACT_MAX", "2000"))   # auto: exact clustering up to this many candidates
+CLUSTER_KNN_NEIGHBORS = int(os.getenv("CLUSTER_KNN_NEIGHBORS", "15"))
+
+# LLM summarization (timeline_builder.build_timeline)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")             # openai | fake (offline stand-in)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))      # clusters summarized in parallel
+LLM_REQUESTS_PER_MIN = int(os.getenv("LLM_REQUESTS_PER_MIN", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))      # retries on 429/5xx
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))           # per-cluster deadline (seconds)
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "1") == "1"
+SUMMARY_CACHE_MAX_MB = float(os.getenv("SUMMARY_CACHE_MAX_MB", "50"))
+EVIDENCE_TOKEN_BUDGET = int(os.getenv("EVIDENCE_TOKEN_BUDGET", "1200"))   # max tokens of quotes per prompt (0 = no limit)
+EVIDENCE_MMR_LAMBDA = float(os.getenv("EVIDENCE_MMR_LAMBDA", "0.7"))       # 1 = most central quotes, 0 = most diverse
+EVIDENCE_SOURCE_PENALTY = float(os.getenv("EVIDENCE_SOURCE_PENALTY", "0.2"))   # score penalty for an already-quoted source
+PIPELINE_CACHE_TTL = int(os.getenv("PIPELINE_CACHE_TTL", "1800"))   # app.py: seconds a (query, max_articles) result is reused
+
+# Tracked events (pipeline.stream_update)
+EVENT_STORE_PATH = os.getenv("EVENT_STORE_PATH", os.path.join(CACHE_DIR, "events.sqlite"))
+
+# Pipeline server (pipeline_server.py)
+PIPELINE_SERVER_URL = os.getenv("PIPELINE_SERVER_URL", "")          # app.py: submit jobs here instead of running in-process
+PIPELINE_SERVER_PORT = int(os.getenv("PIPELINE_SERVER_PORT", "8600"))
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))          # jobs run concurrently (models are shared)
+PIPELINE_JOB_TTL = int(os.getenv("PIPELINE_JOB_TTL", "3600"))       # seconds a finished job stays queryable
+PIPELINE_MAX_ARTICLES = int(os.getenv("PIPELINE_MAX_ARTICLES", "200"))   # largest max_articles a job may ask for
+PIPELINE_POLL_INTERVAL = float(os.getenv("PIPELINE_POLL_INTERVAL", "0.5"))   # app.py: seconds between status polls
+
+# Streaming pipeline (pipeline.stream_pipeline)
+STREAM_ARTICLES_PER_BATCH = int(os.getenv("STREAM_ARTICLES_PER_BATCH", "4"))   # articles per extraction micro-batch
+
+# Instrumentation
+PROFILE_STAGE = os.getenv("PROFILE_STAGE", "")   # span name to capture with cProfile, e.g. "nlp.spacy"
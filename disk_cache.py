@@ -0,0 +1,133 @@
+# disk_cache.py
+# Small SQLite-backed key/value cache with TTL, size-bounded LRU eviction and hit/miss counters.
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class DiskCache:
+    """
+    Persistent JSON cache stored in one SQLite table.
+    Entries older than `ttl` seconds are stale (still readable through lookup()
+    so callers can revalidate them); once the stored values exceed `max_bytes`
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, table="cache", ttl=None, max_bytes=None):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_lru ON {table}(accessed_at)")
+        self._conn.commit()
+
+    def _is_fresh(self, stored_at, now):
+        return self.ttl is None or now - stored_at <= self.ttl
+
+    def lookup(self, key):
+        """Return (value, fresh) for a key, or (None, False) if it is not cached."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, False
+            fresh = self._is_fresh(row[1], now)
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0]), fresh
+
+    def get(self, key, default=None):
+        """Return the cached value if present and fresh."""
+        value, fresh = self.lookup(key)
+        return value if fresh else default
+
+    def set(self, key, value):
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key):
+        """Mark an entry as freshly validated (e.g. after an HTTP 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE {self.table} SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+            self._conn.commit()
+            self.revalidated += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self):
+        # caller holds the lock
+        if not self.max_bytes:
+            return
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "revalidated": self.revalidated,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,208 @@
+# embedding_cache.py
+# Content-addressed sentence embedding store: a memory-mapped vector matrix plus an append-only index.
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+import numpy as np
+from config import CACHE_DIR, EMBED_STORAGE
+
+DTYPE = np.float32
+MIN_CAPACITY = 1024
+# storage mode -> (on-disk dtype, file name); int8 holds unit vectors scaled by INT8_SCALE
+STORAGE = {
+    "float32": (np.float32, "vectors.f32"),
+    "float16": (np.float16, "vectors.f16"),
+    "int8": (np.int8, "vectors.i8"),
+}
+INT8_SCALE = 127.0
+
+try:
+    import fcntl
+except ImportError:   # Windows: no cross-process lock, so use one directory per process there
+    fcntl = None
+
+
+def encode_vectors(vectors, storage="float32"):
+    """float32 vectors -> the storage dtype (int8 assumes L2-normalized input)."""
+    vectors = np.asarray(vectors, dtype=DTYPE)
+    if storage == "int8":
+        return np.clip(np.rint(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+    return vectors.astype(STORAGE[storage][0], copy=False)
+
+
+def decode_vectors(stored, storage="float32"):
+    """Stored vectors -> float32 (float32 storage is returned as-is, no copy)."""
+    if storage == "int8":
+        return stored.astype(DTYPE) / INT8_SCALE
+    if storage == "float16":
+        return stored.astype(DTYPE)
+    return stored
+
+
+def sentence_key(model_name, sentence):
+    return hashlib.sha1(f"{model_name}\0{sentence}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store for one model.
+    vectors.f32 holds a (capacity, dim) float32 matrix that is memory-mapped;
+    index.tsv maps sentence hashes to row numbers. Cache hits are returned as
+    views into the memmap (no copy); only misses are encoded.
+    storage="float16" / "int8" keep half / a quarter of the bytes (int8 assumes
+    L2-normalized vectors); hits are then decoded to float32 copies.
+    Processes sharing a directory (app, batch.py, pipeline_server.py) serialize
+    writes with a file lock and pick up each other's rows from the index tail.
+    """
+
+    def __init__(self, model_name, directory=None, storage=EMBED_STORAGE):
+        if storage not in STORAGE:
+            raise ValueError(f"Unknown embedding storage {storage!r}; choose from {sorted(STORAGE)}")
+        self.model_name = model_name
+        self.storage = storage
+        self.dtype, filename = STORAGE[storage]
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        if storage != "float32":
+            slug += f"-{storage}"
+        self.directory = directory or os.path.join(CACHE_DIR, "embeddings", slug)
+        os.makedirs(self.directory, exist_ok=True)
+        self.vectors_path = os.path.join(self.directory, filename)
+        self.index_path = os.path.join(self.directory, "index.tsv")
+        self.lock_path = os.path.join(self.directory, "write.lock")
+        self.dim = None
+        self.rows = {}
+        self._index_offset = 0   # bytes of index.tsv already read
+        self._next_row = 0
+        self.hits = 0
+        self.misses = 0
+        self._matrix = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self._sync_index()
+        if self.dim is None:
+            return
+        self._open()
+        # drop index rows whose vectors never made it to disk
+        capacity = self._matrix.shape[0] if self._matrix is not None else 0
+        self.rows = {k: r for k, r in self.rows.items() if r < capacity}
+
+    def _sync_index(self):
+        """Read index lines appended since the last read (by this or another process)."""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1   # a torn last line is left for the next read
+        for line in data[:end].decode("utf-8").splitlines():
+            parts = line.split("\t")
+            if len(parts) != 2:
+                continue
+            if parts[0] == "dim":
+                self.dim = int(parts[1])
+                continue
+            row = int(parts[1])
+            self.rows[parts[0]] = row
+            self._next_row = max(self._next_row, row + 1)
+        self._index_offset += end
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _open(self):
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        capacity = size // (self.dim * np.dtype(self.dtype).itemsize)
+        self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim)) if capacity else None
+
+    def _ensure_capacity(self, needed):
+        # caller holds the write lock; capacity comes from the file, which another process may have grown
+        row_bytes = self.dim * np.dtype(self.dtype).itemsize
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        capacity = size // row_bytes
+        if needed > capacity:
+            capacity = max(MIN_CAPACITY, capacity * 2, needed)
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        if self._matrix is None or self._matrix.shape[0] != capacity:
+            self._open()
+
+    def get(self, sentence):
+        """Return the cached vector for a sentence (a read-through memmap view for float32) or None."""
+        row = self.rows.get(sentence_key(self.model_name, sentence))
+        if row is None:
+            return None
+        return decode_vectors(self._matrix[row], self.storage)
+
+    def add(self, sentences, vectors):
+        vectors = np.asarray(vectors, dtype=DTYPE)
+        if not len(sentences):
+            return
+        with self._write_lock():
+            self._sync_index()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.write(f"dim\t{self.dim}\n")
+                self._index_offset = os.path.getsize(self.index_path)
+            self._ensure_capacity(self._next_row + len(sentences))
+            lines = []
+            row = self._next_row
+            for s, v in zip(sentences, encode_vectors(vectors, self.storage)):
+                key = sentence_key(self.model_name, s)
+                if key in self.rows:
+                    continue
+                self._matrix[row] = v
+                lines.append(f"{key}\t{row}\n")
+                self.rows[key] = row
+                row += 1
+            self._next_row = row
+            # vectors first, then the index, so the index never points at unwritten rows
+            self._matrix.flush()
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self._index_offset = os.path.getsize(self.index_path)
+
+    def encode(self, sentences, encode_fn):
+        """
+        Return (one float32 vector per sentence, number of cache hits), calling
+        encode_fn only on cache misses. Hits are memmap views (decoded copies for
+        float16/int8); misses are rows of encode_fn's output.
+        """
+        out = [None] * len(sentences)
+        missing = {}
+        hits = 0
+        for i, s in enumerate(sentences):
+            v = self.get(s)
+            if v is not None:
+                out[i] = v
+                hits += 1
+            else:
+                missing.setdefault(s, []).append(i)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(sentences) - hits
+        if missing:
+            miss_sentences = list(missing)
+            vectors = np.asarray(encode_fn(miss_sentences), dtype=DTYPE)
+            self.add(miss_sentences, vectors)
+            for s, v in zip(miss_sentences, vectors):
+                for i in missing[s]:
+                    out[i] = v
+        return out, hits
+
+    def stats(self):
+        return {"entries": len(self.rows), "hits": self.hits, "misses": self.misses}
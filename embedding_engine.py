@@ -0,0 +1,123 @@
+# embedding_engine.py
+# Sentence embedding with length-bucketed batches, a tuned batch size and a capped thread pool.
+# Returns L2-normalized float32 vectors, so cosine similarity is a plain dot product.
+import threading
+import time
+import numpy as np
+from config import EMBED_BATCH_SIZE, EMBED_MAX_BATCH_TOKENS, EMBED_THREADS
+import models
+
+# batch sizes tried by tune(); the probe is skipped for small inputs
+TUNE_SIZES = (16, 32, 64, 128)
+TUNE_MIN_SENTENCES = 256
+DEFAULT_BATCH_SIZE = 32
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def estimate_tokens(sentence):
+    # ~4 characters per word piece plus [CLS]/[SEP]
+    return len(sentence) // 4 + 2
+
+
+def normalize(vectors):
+    """Row-wise L2 normalization to float32 (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def set_threads(threads):
+    """Cap torch's intra-op threads so encoding leaves cores for fetch/spaCy workers."""
+    if not threads:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+
+
+class EmbeddingEngine:
+    """
+    Wraps a SentenceTransformer-like model (anything with
+    encode(sentences, batch_size=..., show_progress_bar=..., convert_to_numpy=...)).
+    Sentences are sorted by length and cut into batches of similar length, each
+    holding at most `batch_size` sentences and about `max_batch_tokens` padded
+    tokens, so short sentences batch widely and long ones don't blow up padding.
+    batch_size="auto" times a probe sample at a few sizes on first large input.
+    """
+
+    def __init__(self, model=None, batch_size=EMBED_BATCH_SIZE, max_batch_tokens=EMBED_MAX_BATCH_TOKENS,
+                 threads=EMBED_THREADS):
+        self._model = model
+        self.batch_size = None if batch_size == "auto" else int(batch_size)
+        self.max_batch_tokens = max_batch_tokens
+        self.threads = threads
+        self.tune_results = {}
+        self._threads_set = False
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = models.get_embed_model()
+        return self._model
+
+    def _encode_batch(self, batch):
+        return self.model.encode(batch, batch_size=len(batch), show_progress_bar=False, convert_to_numpy=True)
+
+    def batches(self, sentences, batch_size):
+        """Index arrays of length-sorted batches within the sentence and token caps."""
+        order = np.argsort([len(s) for s in sentences], kind="stable")
+        pos, n = 0, len(order)
+        while pos < n:
+            end = min(pos + batch_size, n)
+            # sorted ascending: the last sentence sets the padded length of the batch
+            longest = estimate_tokens(sentences[order[end - 1]])
+            end = min(end, pos + max(1, self.max_batch_tokens // longest))
+            yield order[pos:end]
+            pos = end
+
+    def tune(self, sentences):
+        """Pick the batch size with the best sentences/second on a length-spread probe sample."""
+        ordered = sorted(sentences, key=len)
+        step = max(1, len(ordered) // 128)
+        probe = ordered[::step][:128]
+        self._encode_batch(probe[:8])   # warm-up (first call pays allocator / kernel setup)
+        for size in TUNE_SIZES:
+            start = time.perf_counter()
+            for idx in self.batches(probe, size):
+                self._encode_batch([probe[i] for i in idx])
+            self.tune_results[size] = round(len(probe) / (time.perf_counter() - start), 1)
+        self.batch_size = max(self.tune_results, key=self.tune_results.get)
+        return self.batch_size
+
+    def encode(self, sentences):
+        """(len(sentences), dim) L2-normalized float32 matrix, rows in input order."""
+        sentences = list(sentences)
+        if not self._threads_set:
+            set_threads(self.threads)
+            self._threads_set = True
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.batch_size is None and len(sentences) >= TUNE_MIN_SENTENCES:
+            self.tune(sentences)
+        out = None
+        for idx in self.batches(sentences, self.batch_size or DEFAULT_BATCH_SIZE):
+            vectors = normalize(self._encode_batch([sentences[i] for i in idx]))
+            if out is None:
+                out = np.empty((len(sentences), vectors.shape[1]), dtype=np.float32)
+            out[idx] = vectors
+        return out
+
+
+def get_engine():
+    """Process-wide engine over the shared embedding model (batch size is tuned once per process)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = EmbeddingEngine()
+    return _engine
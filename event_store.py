@@ -0,0 +1,208 @@
+# event_store.py
+# Persistent state of tracked events (one per query) for incremental timeline updates:
+# processed articles, clusters with their members and running embedding statistics, and summaries.
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from candidates import CandidateBatch
+from clustering import cluster_labels
+from config import CLUSTER_BACKEND, EVENT_STORE_PATH
+from fetch_articles import canonical_url
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def query_key(query):
+    return " ".join(query.lower().split())
+
+
+def is_fallback(entry):
+    """Entries built by fallback_summary after an LLM failure are summarized again on the next update."""
+    return str(entry.get("notes") or "").startswith("LLM error:")
+
+
+class TrackedEvent:
+    """
+    In-memory state of one tracked query. Each cluster keeps its candidates
+    (without embeddings) plus the sum of their vectors and of their squared
+    norms, which is all that is needed to test a new candidate against the
+    cluster (same RMS-distance rule as clustering.leader_labels).
+    """
+
+    def __init__(self, query, last_published_at=None, updated_at=None, urls=None, clusters=None):
+        self.query = query
+        self.last_published_at = last_published_at
+        self.updated_at = updated_at
+        self.urls = set(urls or ())
+        # {"members": [...], "sum": float32 vector, "sq_sum": float, "entry": timeline entry or None}
+        self.clusters = clusters or []
+
+    def is_new(self, article):
+        return canonical_url(article.get("url")) not in self.urls
+
+    def add_articles(self, articles, advance=True):
+        """
+        Record processed articles. With advance=False the publish-date watermark
+        stays put (older articles since it are still unfetched), so the next
+        update searches the same span again; known URLs are skipped.
+        """
+        for a in articles:
+            if a.get("url"):
+                self.urls.add(canonical_url(a["url"]))
+            pub = a.get("published_at")
+            if advance and pub and (self.last_published_at is None or pub > self.last_published_at):
+                self.last_published_at = pub
+
+    def assign(self, candidates, distance_threshold=1.05, backend=CLUSTER_BACKEND):
+        """
+        Add embedded candidates: each joins the closest existing cluster whose
+        RMS distance is below the threshold; the rest are clustered among
+        themselves into new clusters. Returns the indices of clusters whose
+        membership changed.
+        """
+        if not len(candidates):
+            return []
+        candidates = CandidateBatch.from_dicts(candidates)
+        X = candidates.embeddings
+        # members are stored as plain dicts, without the embedding
+        rows = [{k: v for k, v in c.items() if k != "embedding"} for c in candidates]
+        changed = set()
+        leftover = []
+        limit = distance_threshold ** 2
+        if self.clusters:
+            sums = np.vstack([cl["sum"] for cl in self.clusters])
+            sq_sums = np.array([cl["sq_sum"] for cl in self.clusters], dtype=np.float64)
+            counts = np.array([len(cl["members"]) for cl in self.clusters], dtype=np.float64)
+        for i in range(len(rows)):
+            x = X[i]
+            xx = float(x @ x)
+            if self.clusters:
+                msd = xx - 2.0 * (sums @ x) / counts + sq_sums / counts
+                j = int(np.argmin(msd))
+                if msd[j] < limit:
+                    sums[j] += x
+                    sq_sums[j] += xx
+                    counts[j] += 1
+                    self.clusters[j]["members"].append(rows[i])
+                    changed.add(j)
+                    continue
+            leftover.append(i)
+        for j in changed:
+            self.clusters[j]["sum"] = sums[j]
+            self.clusters[j]["sq_sum"] = float(sq_sums[j])
+        if leftover:
+            labels = cluster_labels(X[leftover], distance_threshold, backend=backend)
+            new = {}
+            for i, lab in zip(leftover, labels):
+                cl = new.get(int(lab))
+                if cl is None:
+                    cl = new[int(lab)] = {"members": [], "sum": np.zeros(X.shape[1], dtype=np.float32), "sq_sum": 0.0, "entry": None}
+                cl["members"].append(rows[i])
+                cl["sum"] += X[i]
+                cl["sq_sum"] += float(X[i] @ X[i])
+            for cl in new.values():
+                changed.add(len(self.clusters))
+                self.clusters.append(cl)
+        for j in changed:
+            self.clusters[j]["entry"] = None
+        return sorted(changed)
+
+    def stale_clusters(self):
+        """Clusters that need a (new) summary."""
+        return [j for j, cl in enumerate(self.clusters) if cl["entry"] is None or is_fallback(cl["entry"])]
+
+    def entries(self):
+        return [cl["entry"] for cl in self.clusters if cl["entry"] is not None]
+
+
+class EventStore:
+    """SQLite store of TrackedEvents keyed by normalized query (JSON members, float32 blobs for vector sums)."""
+
+    def __init__(self, path=EVENT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._query_locks = {}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "query TEXT PRIMARY KEY, last_published_at TEXT, updated_at REAL NOT NULL, urls TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS clusters ("
+            "query TEXT NOT NULL, idx INTEGER NOT NULL, members TEXT NOT NULL, sum BLOB NOT NULL, "
+            "sq_sum REAL NOT NULL, entry TEXT, PRIMARY KEY (query, idx))"
+        )
+        self._conn.commit()
+
+    def lock(self, query):
+        """Per-query lock so two updates of the same event don't interleave."""
+        with self._lock:
+            return self._query_locks.setdefault(query_key(query), threading.Lock())
+
+    def load(self, query):
+        """The stored event for `query`, or a new empty one."""
+        key = query_key(query)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_published_at, updated_at, urls FROM events WHERE query = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return TrackedEvent(query)
+            rows = self._conn.execute(
+                "SELECT members, sum, sq_sum, entry FROM clusters WHERE query = ? ORDER BY idx", (key,)
+            ).fetchall()
+        clusters = [{
+            "members": json.loads(members),
+            "sum": np.frombuffer(blob, dtype=np.float32).copy(),
+            "sq_sum": sq_sum,
+            "entry": json.loads(entry) if entry else None,
+        } for members, blob, sq_sum, entry in rows]
+        return TrackedEvent(query, row[0], row[1], json.loads(row[2]), clusters)
+
+    def save(self, event, changed=None):
+        """Persist `event`; with `changed` (cluster indices) only those cluster rows are rewritten."""
+        key = query_key(event.query)
+        event.updated_at = time.time()
+        indices = range(len(event.clusters)) if changed is None else changed
+        rows = []
+        for j in indices:
+            cl = event.clusters[j]
+            rows.append((key, j, json.dumps(cl["members"]), np.asarray(cl["sum"], dtype=np.float32).tobytes(),
+                         cl["sq_sum"], json.dumps(cl["entry"]) if cl["entry"] is not None else None))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO events (query, last_published_at, updated_at, urls) VALUES (?, ?, ?, ?)",
+                (key, event.last_published_at, event.updated_at, json.dumps(sorted(event.urls))),
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO clusters VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def delete(self, query):
+        key = query_key(query)
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE query = ?", (key,))
+            self._conn.execute("DELETE FROM clusters WHERE query = ?", (key,))
+            self._conn.commit()
+
+    def queries(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT query FROM events ORDER BY updated_at DESC")]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_event_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventStore()
+    return _store
@@ -0,0 +1,56 @@
+# evidence.py
+# Picks the quotes of a cluster that go into its LLM prompt: central, non-redundant,
+# from as many sources as possible, within a token budget.
+import numpy as np
+from candidates import CandidateBatch
+from config import EVIDENCE_TOKEN_BUDGET, EVIDENCE_MMR_LAMBDA, EVIDENCE_SOURCE_PENALTY
+from embedding_engine import normalize
+
+
+def select_evidence(cluster, costs, budget=EVIDENCE_TOKEN_BUDGET, mmr_lambda=EVIDENCE_MMR_LAMBDA,
+                    source_penalty=EVIDENCE_SOURCE_PENALTY):
+    """
+    Indices (in cluster order) of the candidates to quote, where `costs[i]` is
+    the token cost of quoting candidate i. Greedy MMR: each step takes the
+    candidate that fits the remaining budget and maximizes
+
+        mmr_lambda * sim(candidate, centroid) - (1 - mmr_lambda) * max sim(candidate, selected)
+        - source_penalty (if its source is already quoted)
+
+    The most central candidate is always kept, even over budget. Clusters
+    without embeddings (tracked-event members) rank by number of collapsed
+    duplicates instead of centrality, still spreading over sources.
+    """
+    batch = CandidateBatch.from_dicts(cluster)
+    n = len(batch)
+    costs = np.asarray(costs, dtype=np.float64)
+    if not budget or costs.sum() <= budget:
+        return list(range(n))
+    _, source_ids = np.unique([str(batch.articles.rows[a][2]) for a in batch.article_index], return_inverse=True)
+    if batch.embeddings is not None:
+        X = normalize(batch.embeddings)
+        centroid = X.mean(axis=0)
+        centroid /= np.linalg.norm(centroid) or 1.0
+        relevance = X @ centroid
+    else:
+        X = None
+        corroboration = np.array([len(d) for d in batch.duplicates], dtype=np.float64)
+        relevance = corroboration / (corroboration.max() + 1.0)
+    redundancy = np.zeros(n)
+    penalty = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    selected = []
+    remaining = float(budget)
+    while True:
+        fits = available if not selected else available & (costs <= remaining)
+        if not fits.any():
+            break
+        score = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy - penalty
+        i = int(np.argmax(np.where(fits, score, -np.inf)))
+        selected.append(i)
+        available[i] = False
+        remaining -= costs[i]
+        if X is not None:
+            redundancy = np.maximum(redundancy, X @ X[i])
+        penalty[source_ids == source_ids[i]] = source_penalty
+    return sorted(selected)
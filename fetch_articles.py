@@ -1,24 +1,60 @@
 # fetch_articles.py
-# fetch_articles.py (robust extractor: tries newspaper3k if available, otherwise BeautifulSoup)
+# fetch_articles.py (robust extractor: tries newspaper3k if available, otherwise a one-pass HTML parser)
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-from config import NEWSAPI_KEY, MAX_ARTICLES
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta
+from dateutil.parser import parse as parse_dt
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import re
+import threading
 import time
+import os
+from html.parser import HTMLParser
+from contextlib import nullcontext
+from config import NEWSAPI_KEY, MAX_ARTICLES, FETCH_WORKERS, FETCH_PER_HOST, FETCH_TIMEOUT, FETCH_DEADLINE, FETCH_MAX_BYTES
+from config import NEWSAPI_PAGE_SIZE, NEWSAPI_WINDOWS, NEWSAPI_LOOKBACK_DAYS, NEWSAPI_WORKERS
+from config import NEWSAPI_REQUESTS_PER_MIN, NEWSAPI_MAX_RETRIES
+from config import CACHE_DIR, ARTICLE_CACHE_ENABLED, ARTICLE_CACHE_TTL, ARTICLE_CACHE_MAX_MB
+from disk_cache import DiskCache
+from llm_client import TokenBucket, RETRYABLE_STATUS
+import instrumentation
+
+try:
+    # optional: much faster parsing (newspaper3k already depends on it)
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
 
 NEWSAPI_URL = "https://newsapi.org/v2/everything"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+_session = None
+_session_lock = threading.Lock()
+_article_cache = None
+_newsapi_bucket = None
 
-def fetch_from_newsapi(query, page_size=MAX_ARTICLES):
+# NewsAPI metadata kept alongside the extracted text in the article cache
+CACHED_FIELDS = ("title", "url", "published_at", "source", "raw_content", "content")
+
+def fetch_from_newsapi(query, page_size=MAX_ARTICLES, page=1, from_date=None, to_date=None, session=None):
+    """One NewsAPI /everything page, optionally restricted to a [from_date, to_date] window."""
     params = {
         "q": query,
         "language": "en",
         "sortBy": "publishedAt",
-        "pageSize": page_size,
+        "pageSize": min(page_size, NEWSAPI_PAGE_SIZE),
+        "page": page,
         "apiKey": NEWSAPI_KEY
     }
-    resp = requests.get(NEWSAPI_URL, params=params, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
+    if from_date:
+        params["from"] = from_date
+    if to_date:
+        params["to"] = to_date
+    with instrumentation.span("fetch.newsapi"):
+        resp = (session or requests).get(NEWSAPI_URL, params=params, timeout=30)
+        resp.raise_for_status()
+        data = resp.json()
     articles = []
     for item in data.get("articles", []):
         url = item.get("url")
@@ -32,61 +68,515 @@ def fetch_from_newsapi(query, page_size=MAX_ARTICLES):
         })
     return articles
 
-def simple_text_from_html(url, timeout=8):
-    """Fetch page HTML and heuristically extract text using BeautifulSoup."""
-    try:
-        r = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
+def get_newsapi_limiter():
+    global _newsapi_bucket
+    with _session_lock:
+        if _newsapi_bucket is None:
+            rate = NEWSAPI_REQUESTS_PER_MIN / 60.0
+            _newsapi_bucket = TokenBucket(rate, capacity=max(1, NEWSAPI_WORKERS))
+    return _newsapi_bucket
 
-        # Remove scripts/styles and common layout elements
-        for tag in soup(["script", "style", "aside", "nav", "footer", "form", "header", "noscript"]):
-            tag.decompose()
+def fetch_newsapi_page(query, page, window=(None, None), page_size=NEWSAPI_PAGE_SIZE,
+                       session=None, limiter=None, max_retries=NEWSAPI_MAX_RETRIES):
+    """fetch_from_newsapi behind the shared rate limiter, retrying 429/5xx with backoff (honours Retry-After)."""
+    limiter = limiter or get_newsapi_limiter()
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        try:
+            return fetch_from_newsapi(query, page_size, page=page, from_date=window[0], to_date=window[1], session=session)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status not in RETRYABLE_STATUS or attempt >= max_retries:
+                raise
+            instrumentation.incr("newsapi_retries")
+            retry_after = e.response.headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
 
-        # Prefer <article> or <main>
-        main = soup.find("article") or soup.find("main")
-        if main:
-            paragraphs = main.find_all("p")
-        else:
-            paragraphs = soup.find_all("p")
+def date_windows(n, lookback_days=NEWSAPI_LOOKBACK_DAYS, now=None, since=None):
+    """
+    Split the last `lookback_days` (or the span since `since`, an ISO timestamp)
+    before `now` into `n` consecutive (from, to) ISO windows, newest first.
+    """
+    if n <= 1:
+        return [(since, now.isoformat() if now else None)]
+    end = now or datetime.utcnow().replace(microsecond=0)
+    if since:
+        start = parse_dt(since).replace(tzinfo=None)
+        if start >= end:
+            return [(since, now.isoformat() if now else None)]
+        step = (end - start) / n
+    else:
+        step = timedelta(days=lookback_days) / n
+    windows = []
+    for i in range(n):
+        hi = end - step * i
+        lo = end - step * (i + 1)
+        windows.append((lo.isoformat(), hi.isoformat()))
+    return windows
 
-        text_blocks = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
-        text = "\n\n".join(text_blocks).strip()
+# query parameters that only track the referral, never select content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "cmpid", "ref", "ref_src", "smid", "ocid", "guccounter"}
 
-        # Fallback to body text
-        if not text:
-            body = soup.body
-            text = body.get_text(separator="\n", strip=True) if body else ""
+def canonical_url(url):
+    """Normalize a URL for deduplication: scheme/host case, www., tracking params, fragment, AMP and trailing slash."""
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("amp."):
+        host = host[4:]
+    path = parts.path or "/"
+    if path.endswith("/amp") or path.endswith("/amp/"):
+        path = path.rstrip("/")[:-len("/amp")] or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, urlencode(query), ""))
+
+def dedupe_articles(articles):
+    """Keep the first article per canonical URL (articles without a URL are kept as-is)."""
+    seen = set()
+    unique = []
+    for a in articles:
+        key = canonical_url(a.get("url"))
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(a)
+    instrumentation.incr("duplicate_urls", len(articles) - len(unique))
+    return unique
+
+def search_newsapi(query, limit=MAX_ARTICLES, windows=NEWSAPI_WINDOWS, workers=NEWSAPI_WORKERS,
+                   page_size=NEWSAPI_PAGE_SIZE, lookback_days=NEWSAPI_LOOKBACK_DAYS, since=None, until=None):
+    """
+    Up to `limit` unique articles for `query`, fetched page by page.
+    With windows > 1 the lookback span is split into date windows so the
+    results cover the whole period rather than only the newest stories.
+    Page 1 of every window is requested concurrently; further pages of a window
+    are requested only while it keeps returning full pages and its share of
+    `limit` isn't met. All requests share the NewsAPI rate limiter. Results
+    are deduplicated by canonical URL before any download happens; each window
+    contributes up to its share of `limit` (short windows leave room for the
+    others), newest window first. A failing later page just ends its window.
+    With `since` / `until` (ISO timestamps) only articles published from / up to then are requested.
+    """
+    now = parse_dt(until).replace(tzinfo=None) if until else None
+    plan = date_windows(windows, lookback_days, now=now, since=since)
+    quota = -(-limit // len(plan))
+    page_size = max(1, min(page_size, NEWSAPI_PAGE_SIZE, quota))
+    session = get_session()
+    pages = {}   # (window index, page) -> articles
+    errors = []
+    exhausted = set()   # windows that ran out of results (or failed)
+
+    fetch_one = instrumentation.bind(fetch_newsapi_page)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        def submit(w, page):
+            return pool.submit(fetch_one, query, page, plan[w], page_size, session)
+
+        pending = {submit(w, 1): (w, 1) for w in range(len(plan))}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                w, page = pending.pop(fut)
+                try:
+                    items = fut.result()
+                except Exception as e:
+                    errors.append(e)
+                    exhausted.add(w)
+                    continue
+                pages[(w, page)] = items
+                if len(items) < page_size:
+                    exhausted.add(w)
+                    continue
+                got = sum(len(v) for (pw, _), v in pages.items() if pw == w)
+                total = sum(len(v) for v in pages.values())
+                # past its share only to make up for windows that came back short
+                if got < quota or (exhausted and total < limit):
+                    pending[submit(w, page + 1)] = (w, page + 1)
+
+    if not pages and errors:
+        raise errors[0]
+    window_of = {id(a): w for (w, _), items in pages.items() for a in items}
+    by_window = [[] for _ in plan]
+    for a in dedupe_articles([a for key in sorted(pages) for a in pages[key]]):
+        by_window[window_of[id(a)]].append(a)
+    chosen = [items[:quota] for items in by_window]
+    spare = limit - sum(len(c) for c in chosen)
+    for w, items in enumerate(by_window):
+        if spare <= 0:
+            break
+        extra = items[quota:quota + spare]
+        chosen[w] += extra
+        spare -= len(extra)
+    return [a for c in chosen for a in c][:limit]
+
+def get_session():
+    """Process-wide pooled HTTP session shared by all article downloads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers.update(HEADERS)
+            _session = s
+    return _session
 
+def get_article_cache():
+    """Shared on-disk cache of extracted article text, keyed by URL (None when disabled)."""
+    global _article_cache
+    if not ARTICLE_CACHE_ENABLED:
+        return None
+    with _session_lock:
+        if _article_cache is None:
+            _article_cache = DiskCache(
+                os.path.join(CACHE_DIR, "articles.sqlite"),
+                table="articles",
+                ttl=ARTICLE_CACHE_TTL,
+                max_bytes=int(ARTICLE_CACHE_MAX_MB * 1024 * 1024),
+            )
+    return _article_cache
+
+class HostLimiter:
+    """Caps the number of in-flight requests per host (replaces the global sleep)."""
+
+    def __init__(self, per_host=FETCH_PER_HOST):
+        self.per_host = max(1, per_host)
+        self._sems = {}
+        self._lock = threading.Lock()
+
+    def slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = self._sems[host] = threading.BoundedSemaphore(self.per_host)
+        return sem
+
+# layout / non-content elements whose text is never article text
+SKIP_TAGS = ("script", "style", "aside", "nav", "footer", "form", "header", "noscript")
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+def clean_text(text):
+    return " ".join(text.split())
+
+class ParagraphParser(HTMLParser):
+    """
+    Single streaming pass over the markup (no tree): collects <p> text outside
+    SKIP_TAGS, remembering which <article> / <main> each paragraph sits in,
+    plus all visible body text for pages without paragraphs.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip = 0
+        self.open = {"article": 0, "main": 0}
+        self.seen = {"article": 0, "main": 0}
+        self.current = {"article": None, "main": None}
+        self.paragraphs = []   # (text, article ordinal, main ordinal)
+        self.body = []
+        self._p = None
+
+    def _close_p(self):
+        if self._p is not None:
+            text = clean_text("".join(self._p))
+            if text:
+                self.paragraphs.append((text, self.current["article"], self.current["main"]))
+            self._p = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        elif tag in self.open:
+            if not self.open[tag]:
+                self.current[tag] = self.seen[tag]
+                self.seen[tag] += 1
+            self.open[tag] += 1
+        elif tag == "p" and not self.skip:
+            self._close_p()   # <p> can't nest; a new one ends the previous
+            self._p = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip = max(0, self.skip - 1)
+        elif tag in self.open and self.open[tag]:
+            self._close_p()
+            self.open[tag] -= 1
+            if not self.open[tag]:
+                self.current[tag] = None
+        elif tag == "p":
+            self._close_p()
+
+    def handle_data(self, data):
+        if self.skip:
+            return
+        if self._p is not None:
+            self._p.append(data)
+        self.body.append(data)
+
+    def text(self):
+        self._close_p()
+        # same preference as before: the first <article>, else the first <main>, else every <p>
+        if self.seen["article"]:
+            blocks = [t for t, a, _ in self.paragraphs if a == 0]
+        elif self.seen["main"]:
+            blocks = [t for t, _, m in self.paragraphs if m == 0]
+        else:
+            blocks = [t for t, _, _ in self.paragraphs]
+        text = "\n\n".join(blocks).strip()
+        if not text:
+            text = "\n".join(line for line in (b.strip() for b in self.body) if line)
         return text
+
+def text_from_html_lxml(html):
+    doc = lxml_html.document_fromstring(html)
+    etree.strip_elements(doc, *SKIP_TAGS, with_tail=False)
+    main = next(doc.iter("article"), None)
+    if main is None:
+        main = next(doc.iter("main"), None)
+    blocks = [t for t in (clean_text(p.text_content()) for p in (main if main is not None else doc).iter("p")) if t]
+    text = "\n\n".join(blocks).strip()
+    if not text:
+        body = doc.find("body")
+        if body is not None:
+            text = "\n".join(line for line in (t.strip() for t in body.itertext()) if line)
+    return text
+
+def text_from_html(html):
+    """
+    Heuristically extract article text from an HTML document in one pass:
+    lxml when installed, otherwise a streaming stdlib parser (no soup tree).
+    Paragraphs of the first <article> (or <main>) win; otherwise body text.
+    """
+    if lxml_html is not None:
+        try:
+            return text_from_html_lxml(html)
+        except (ValueError, etree.ParserError):
+            pass  # e.g. an XML encoding declaration in a str; the stdlib parser copes
+    parser = ParagraphParser()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+def is_html(content_type):
+    """True for HTML responses (and for servers that send no Content-Type)."""
+    if not content_type:
+        return True
+    return content_type.split(";")[0].strip().lower() in HTML_CONTENT_TYPES
+
+def decode_html(body, response):
+    """Decode with the header charset, else a <meta charset> in the first KB, else UTF-8."""
+    encoding = None
+    if "charset=" in (response.headers.get("Content-Type") or "").lower():
+        encoding = response.encoding
+    if not encoding:
+        m = CHARSET_RE.search(body[:1024])
+        encoding = m.group(1).decode("ascii") if m else "utf-8"
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def read_capped(response, max_bytes=FETCH_MAX_BYTES):
+    """Read a streamed body, stopping after max_bytes (the rest of the page is never downloaded)."""
+    chunks, size = [], 0
+    for chunk in response.iter_content(64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            instrumentation.incr("truncated_pages")
+            break
+    return b"".join(chunks)[:max_bytes]
+
+def fetch_page(url, timeout=FETCH_TIMEOUT, session=None, etag=None, last_modified=None, max_bytes=FETCH_MAX_BYTES):
+    """
+    GET a page through the pooled session, sending conditional headers when validators are known.
+    Returns (response, html). The body is streamed and read only for HTML
+    responses, up to max_bytes; html is None for 304s and non-HTML content.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    r = (session or get_session()).get(url, timeout=timeout, headers=headers, stream=True)
+    try:
+        if r.status_code == 304:
+            return r, None
+        r.raise_for_status()
+        if not is_html(r.headers.get("Content-Type")):
+            instrumentation.incr("non_html_responses")
+            return r, None
+        return r, decode_html(read_capped(r, max_bytes), r)
+    finally:
+        # returns the connection to the pool, or drops it if the body was cut off
+        r.close()
+
+def download_html(url, timeout=FETCH_TIMEOUT, session=None):
+    """GET a page through the pooled session; returns the HTML or None on failure."""
+    try:
+        return fetch_page(url, timeout=timeout, session=session)[1]
+    except Exception:
+        return None
+
+def simple_text_from_html(url, timeout=8, session=None):
+    """Fetch page HTML (bounded, HTML only) and heuristically extract its text."""
+    try:
+        html = download_html(url, timeout=timeout, session=session)
+        return text_from_html(html) if html else ""
     except Exception:
         return ""
 
-def enrich_with_full_text(articles):
-    enriched = []
-    for a in articles:
+def text_from_page(url, html):
+    """Extract article text from downloaded HTML (newspaper3k first, then text_from_html)."""
+    full_text = ""
+    # Lazy import: attempt to use newspaper only if available
+    try:
+        from newspaper import Article  # import inside try so ImportError won't crash module import
+        art = Article(url)
+        art.download(input_html=html)  # reuse the pooled download instead of a second request
+        art.parse()
+        full_text = art.text or ""
+    except Exception:
         full_text = ""
-        # Lazy import: attempt to use newspaper only if available
+    if not full_text:
+        # Fallback to the one-pass extractor (works without lxml)
         try:
-            from newspaper import Article  # import inside try so ImportError won't crash module import
-            art = Article(a["url"])
-            art.download()
-            art.parse()
-            full_text = art.text or ""
+            full_text = text_from_html(html)
         except Exception:
-            # Fallback to BeautifulSoup extraction (no compiled lxml dependency)
-            full_text = simple_text_from_html(a["url"]) or a.get("raw_content") or ""
+            full_text = ""
+    return full_text
+
+def extract_full_text(article, timeout=FETCH_TIMEOUT, session=None, cache=None, limiter=None):
+    """
+    Download one article once and extract its text, falling back to the NewsAPI snippet.
+    With a cache, fresh entries skip the network entirely and stale ones are
+    revalidated with a conditional GET (ETag / Last-Modified). Only the network
+    request holds the limiter's per-host slot.
+    """
+    url = article.get("url")
+    if not url:
+        return article.get("raw_content") or ""
+    entry = None
+    if cache is not None:
+        entry, fresh = cache.lookup(url)
+        if entry is not None and fresh:
+            instrumentation.incr("article_cache_hits")
+            return entry.get("content") or article.get("raw_content") or ""
+        instrumentation.incr("article_cache_misses")
+    try:
+        with limiter.slot(url) if limiter else nullcontext(), instrumentation.span("fetch.download"):
+            r, html = fetch_page(
+                url, timeout=timeout, session=session,
+                etag=entry.get("etag") if entry else None,
+                last_modified=entry.get("last_modified") if entry else None,
+            )
+    except Exception:
+        r, html = None, None
+    if r is not None and r.status_code == 304 and entry is not None:
+        cache.touch(url)
+        instrumentation.incr("article_cache_revalidated")
+        return entry.get("content") or article.get("raw_content") or ""
+    full_text = ""
+    if html:
+        with instrumentation.span("fetch.extract"):
+            full_text = text_from_page(url, html)
+    if not full_text:
+        instrumentation.incr("extraction_failures")
+        if entry is not None and r is None:
+            # revalidation failed (timeout, connection error, 4xx/5xx): stale cached text beats the snippet
+            return entry.get("content") or article.get("raw_content") or ""
+        # otherwise the NewsAPI snippet stands in
+    if cache is not None and full_text:
+        record = {k: article.get(k) for k in CACHED_FIELDS}
+        record["content"] = full_text
+        record["etag"] = r.headers.get("ETag")
+        record["last_modified"] = r.headers.get("Last-Modified")
+        cache.set(url, record)
+    return full_text or article.get("raw_content") or ""
+
+def iter_full_text(articles, workers=FETCH_WORKERS, per_host=FETCH_PER_HOST,
+                   timeout=FETCH_TIMEOUT, deadline=FETCH_DEADLINE, cache="default"):
+    """
+    Download and extract full text for every article concurrently, yielding
+    (input index, enriched article) as each download finishes.
+    Requests share one pooled session, at most `per_host` run against the same
+    host at once, each has a `timeout` deadline and the whole batch stops waiting
+    after `deadline` seconds (unfinished articles keep their NewsAPI snippet).
+    Pass cache=None to bypass the article cache.
+    """
+    if not articles:
+        return
+    session = get_session()
+    limiter = HostLimiter(per_host)
+    if cache == "default":
+        cache = get_article_cache()
 
-        enriched.append({
+    @instrumentation.bind
+    def work(a):
+        return extract_full_text(a, timeout=timeout, session=session, cache=cache, limiter=limiter)
+
+    def enriched(i, text):
+        a = articles[i]
+        instrumentation.incr("articles_fetched")
+        return i, {
             **a,
-            "content": full_text,
-        })
-        # be polite to remote servers
-        time.sleep(0.1)
-    return enriched
+            "content": text if text is not None else (a.get("raw_content") or ""),
+        }
+
+    def outcome(fut):
+        try:
+            return fut.result()
+        except Exception:
+            return None
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = {pool.submit(work, a): i for i, a in enumerate(articles)}
+    # absolute deadline: time the consumer spends between items must not cost finished downloads
+    end = time.monotonic() + deadline if deadline else None
+    pending = set(futures)
+    try:
+        while pending:
+            left = None if end is None else max(0.0, end - time.monotonic())
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for fut in sorted(done, key=futures.get):
+                yield enriched(futures[fut], outcome(fut))
+        # past the overall deadline: downloads that finished meanwhile are still used,
+        # only the ones still running keep their NewsAPI snippet
+        for fut in sorted(pending, key=futures.get):
+            if fut.done():
+                yield enriched(futures[fut], outcome(fut))
+            else:
+                fut.cancel()
+                yield enriched(futures[fut], None)
+    finally:
+        # don't block on stragglers past the overall deadline
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def enrich_with_full_text(articles, **kwargs):
+    """Concurrent full-text enrichment (see iter_full_text); results are returned in input order."""
+    results = dict(iter_full_text(articles, **kwargs))
+    return [results[i] for i in range(len(articles))]
+
+def stream_articles(query, limit=MAX_ARTICLES, **kwargs):
+    """Yield enriched articles in completion order, so extraction can start before the slowest download."""
+    raw = search_newsapi(query, limit)
+    for _, art in iter_full_text(raw, **kwargs):
+        yield art
 
 def fetch_articles(query, limit=MAX_ARTICLES):
-    raw = fetch_from_newsapi(query, page_size=limit)
+    raw = search_newsapi(query, limit)
     return enrich_with_full_text(raw)
 
 if __name__ == "__main__":
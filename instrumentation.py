@@ -0,0 +1,162 @@
+# instrumentation.py
+# Lightweight, thread-safe metrics for the pipeline: timing spans, counters and optional
+# cProfile capture of one chosen stage. Exported as a JSON-friendly snapshot.
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from config import PROFILE_STAGE
+
+# span names used across the pipeline (the app offers these for profiling)
+STAGES = [
+    "fetch.newsapi", "fetch.download", "fetch.extract",
+    "nlp.spacy", "nlp.dates", "nlp.embed",
+    "timeline.cluster", "timeline.llm",
+]
+
+
+class Recorder:
+    """
+    Aggregates spans (count / total / max seconds per name) and counters.
+    Spans running on worker threads are summed, so a stage total can exceed
+    wall-clock time when it runs concurrently. With a `parent`, spans and
+    counters are also added to it (e.g. one run's recorder feeding the
+    process-wide one).
+    """
+
+    def __init__(self, profile_stage=PROFILE_STAGE or None, parent=None):
+        self.profile_stage = profile_stage
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+            self.profiles = {}
+            self.started_at = time.time()
+
+    @contextmanager
+    def span(self, name):
+        profiler = None
+        # cProfile can only run one profiler at a time, so concurrent calls of the stage go unprofiled
+        if name == self.profile_stage and self._profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # another profiler (e.g. a debugger) is already active
+                profiler = None
+                self._profile_lock.release()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._add_profile(name, profiler)
+                self._profile_lock.release()
+            self._add_span(name, elapsed)
+
+    def _add_span(self, name, elapsed):
+        with self._lock:
+            s = self.spans.setdefault(name, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            s["count"] += 1
+            s["total_s"] += elapsed
+            s["max_s"] = max(s["max_s"], elapsed)
+        if self.parent is not None:
+            self.parent._add_span(name, elapsed)
+
+    def _add_profile(self, name, profiler):
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+        with self._lock:
+            # keep the first captured call of the stage
+            self.profiles.setdefault(name, out.getvalue())
+
+    def incr(self, name, n=1):
+        if not n:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+        if self.parent is not None:
+            self.parent.incr(name, n)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "elapsed_s": round(time.time() - self.started_at, 4),
+                "spans": {k: {"count": v["count"], "total_s": round(v["total_s"], 4), "max_s": round(v["max_s"], 4)}
+                          for k, v in self.spans.items()},
+                "counters": dict(self.counters),
+                "profile_stage": self.profile_stage,
+                "profiles": dict(self.profiles),
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+
+_recorder = Recorder()
+# recorder of the run in progress in this context (the process-wide one outside recording())
+_current = contextvars.ContextVar("recorder", default=_recorder)
+
+
+def get_recorder():
+    return _current.get()
+
+
+def span(name):
+    """`with instrumentation.span("nlp.spacy"): ...` on the current recorder."""
+    return _current.get().span(name)
+
+
+def incr(name, n=1):
+    _current.get().incr(name, n)
+
+
+@contextmanager
+def recording(profile_stage="default"):
+    """
+    Give the code inside its own Recorder (yielded), so concurrent runs (app
+    sessions, server jobs) don't mix or reset each other's metrics. Everything
+    is also added to the process-wide recorder. Work handed to thread pools
+    must be wrapped with bind() to be counted here.
+    """
+    rec = Recorder((PROFILE_STAGE or None) if profile_stage == "default" else profile_stage, parent=_recorder)
+    token = _current.set(rec)
+    try:
+        yield rec
+    finally:
+        _current.reset(token)
+
+
+def bind(fn):
+    """Wrap `fn` to record into the caller's current recorder when run on another thread."""
+    rec = _current.get()
+
+    def run(*args, **kwargs):
+        token = _current.set(rec)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def reset(profile_stage="default"):
+    """Start a fresh process-wide measurement window, optionally profiling one stage (None disables profiling)."""
+    _recorder.profile_stage = (PROFILE_STAGE or None) if profile_stage == "default" else profile_stage
+    _recorder.reset()
+
+
+def snapshot():
+    return _recorder.snapshot()
@@ -0,0 +1,186 @@
+# llm_client.py
+# Pluggable chat-completion backends with token-bucket rate limiting and retry/backoff.
+import json
+import random
+import re
+import threading
+import time
+from config import OPENAI_API_KEY, LLM_MODEL, LLM_BACKEND, LLM_REQUESTS_PER_MIN, LLM_MAX_RETRIES
+import instrumentation
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) for budgeting and offline accounting."""
+    return len(text) // 4
+
+
+class LLMError(Exception):
+    """Backend failure; `status` is the HTTP status when known (429/5xx are retried)."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self):
+        return self.status in RETRYABLE_STATUS
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Block until a token is available; returns False if the deadline passes first."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class OpenAIBackend:
+    """ChatCompletion backend (openai<1.0 API, as used elsewhere in the repo)."""
+
+    def __init__(self, model=LLM_MODEL, api_key=OPENAI_API_KEY):
+        import openai
+        openai.api_key = api_key
+        self.openai = openai
+        self.model = model
+
+    def complete(self, messages, max_tokens=400, temperature=0.0, timeout=None):
+        err = self.openai.error
+        try:
+            resp = self.openai.ChatCompletion.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                request_timeout=timeout,
+            )
+        except err.RateLimitError as e:
+            raise LLMError(str(e), status=429)
+        except (err.ServiceUnavailableError, err.Timeout, err.APIConnectionError) as e:
+            raise LLMError(str(e), status=503)
+        except err.OpenAIError as e:
+            raise LLMError(str(e), status=getattr(e, "http_status", None))
+        usage = resp.get("usage") or {}
+        instrumentation.incr("llm_prompt_tokens", usage.get("prompt_tokens", 0))
+        instrumentation.incr("llm_completion_tokens", usage.get("completion_tokens", 0))
+        return resp.choices[0].message["content"]
+
+
+class FakeLLMBackend:
+    """
+    Offline stand-in: echoes the first supporting quote back as the milestone.
+    `latency` simulates round-trip time; `fail_statuses` is a list of HTTP
+    statuses to raise on the first calls (e.g. [429, 503]) to exercise retries.
+    """
+
+    model = "fake-llm"
+
+    def __init__(self, latency=0.0, fail_statuses=None):
+        self.latency = latency
+        self.fail_statuses = list(fail_statuses or [])
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, messages, max_tokens=400, temperature=0.0, timeout=None):
+        with self._lock:
+            self.calls += 1
+            status = self.fail_statuses.pop(0) if self.fail_statuses else None
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise LLMError("fake backend timed out", status=504)
+        time.sleep(self.latency)
+        if status:
+            raise LLMError(f"fake backend error {status}", status=status)
+        prompt = messages[-1]["content"]
+        date = re.search(r"Candidate canonical date: (\S+)", prompt)
+        quotes = re.findall(r'- \(([^)]*)\) "(.*)" \(url:', prompt)
+        answer = json.dumps({
+            "date": date.group(1) if date and date.group(1) != "None" else None,
+            "milestone": quotes[0][1][:240] if quotes else "",
+            "confidence": 0.5,
+            "sources": list(dict.fromkeys(src for src, _ in quotes))[:3],
+            "notes": "",
+        })
+        # estimated, so offline runs still report token volume
+        instrumentation.incr("llm_prompt_tokens", sum(estimate_tokens(m["content"]) for m in messages))
+        instrumentation.incr("llm_completion_tokens", estimate_tokens(answer))
+        return answer
+
+
+_backend = None
+_bucket = None
+_lock = threading.Lock()
+
+
+def get_backend():
+    """Process-wide default backend selected by LLM_BACKEND ("openai" or "fake")."""
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = FakeLLMBackend() if LLM_BACKEND == "fake" else OpenAIBackend()
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the default backend (e.g. a FakeLLMBackend for offline runs)."""
+    global _backend
+    with _lock:
+        _backend = backend
+
+
+def get_rate_limiter():
+    global _bucket
+    with _lock:
+        if _bucket is None:
+            _bucket = TokenBucket(LLM_REQUESTS_PER_MIN / 60.0, capacity=max(1, LLM_REQUESTS_PER_MIN // 10))
+    return _bucket
+
+
+def complete_with_retries(messages, backend=None, deadline=None, max_retries=LLM_MAX_RETRIES,
+                          base_delay=1.0, limiter=None, **kwargs):
+    """
+    Rate-limited completion with exponential backoff (plus jitter) on 429/5xx.
+    Raises TimeoutError once `deadline` (time.monotonic()) can no longer be met.
+    """
+    backend = backend or get_backend()
+    limiter = limiter or get_rate_limiter()
+    attempt = 0
+    while True:
+        if not limiter.acquire(deadline=deadline):
+            raise TimeoutError("rate limit wait exceeded the deadline")
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise TimeoutError("deadline exceeded")
+        try:
+            instrumentation.incr("llm_calls")
+            return backend.complete(messages, timeout=timeout, **kwargs)
+        except LLMError as e:
+            if not e.retryable or attempt >= max_retries:
+                raise
+            instrumentation.incr("llm_retries")
+            delay = base_delay * (2 ** attempt) * (0.5 + random.random() / 2)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise TimeoutError(f"deadline exceeded while backing off: {e}")
+            attempt += 1
+            time.sleep(delay)
@@ -0,0 +1,105 @@
+# models.py
+# Lazy, process-wide model registry. Models load on first use (or in a background warm-up thread)
+# and stay cached in this module, so Streamlit reruns and worker threads share one copy.
+import threading
+import time
+from config import EMBEDDING_MODEL, SPACY_MODEL
+
+# Candidate extraction only needs sentence boundaries (parser) and DATE entities (ner)
+UNUSED_PIPES = ["tagger", "attribute_ruler", "lemmatizer"]
+
+_models = {}
+_load_times = {}
+_lock = threading.Lock()
+_warm_thread = None
+
+
+def _load_nlp():
+    import spacy
+    try:
+        nlp = spacy.load(SPACY_MODEL)
+    except OSError:
+        import spacy.cli
+        spacy.cli.download(SPACY_MODEL)
+        nlp = spacy.load(SPACY_MODEL)
+    nlp.select_pipes(disable=[p for p in UNUSED_PIPES if p in nlp.pipe_names])
+    return nlp
+
+
+def _load_embed_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+LOADERS = {
+    "nlp": _load_nlp,
+    "embed_model": _load_embed_model,
+}
+# one lock per model so a slow load never blocks access to an already-loaded one
+_load_locks = {name: threading.Lock() for name in LOADERS}
+# inference locks: spaCy pipelines are not guaranteed thread-safe, so worker threads
+# sharing one model take turns on it (network-bound stages still overlap)
+_use_locks = {name: threading.Lock() for name in LOADERS}
+
+
+def get(name):
+    """Return the named model, loading it on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _load_locks[name]:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name] = LOADERS[name]()
+            _load_times[name] = time.perf_counter() - start
+        return _models[name]
+
+
+def get_nlp():
+    return get("nlp")
+
+
+def get_embed_model():
+    return get("embed_model")
+
+
+def using(name):
+    """Lock to hold while running inference on a shared model: `with models.using("nlp"): ...`"""
+    return _use_locks[name]
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def load_times():
+    """Seconds spent loading each model so far."""
+    return dict(_load_times)
+
+
+def warm_up(names=None, background=True):
+    """
+    Load models ahead of first use. With background=True this returns at once
+    and loads in a daemon thread; repeated calls reuse the running thread.
+    """
+    global _warm_thread
+    names = list(names or LOADERS)
+
+    def run():
+        for name in names:
+            try:
+                get(name)
+            except Exception:
+                # a failed warm-up is retried (and raised) on first real use
+                pass
+
+    if not background:
+        run()
+        return None
+    with _lock:
+        if all(is_loaded(n) for n in names):
+            return None
+        if _warm_thread is None or not _warm_thread.is_alive():
+            _warm_thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+            _warm_thread.start()
+        return _warm_thread
@@ -0,0 +1,82 @@
+# near_duplicates.py
+# MinHash + LSH near-duplicate detection for wire-story copies (articles) and repeated quotes (sentences).
+import hashlib
+import re
+import numpy as np
+
+WORD_RE = re.compile(r"\w+")
+# Mersenne prime 2^31 - 1: (a * h + b) with 31-bit a and 32-bit h stays inside uint64
+PRIME = np.uint64((1 << 31) - 1)
+MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text, size):
+    """Hashed word n-grams of the normalized text (a text shorter than `size` words is one shingle)."""
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams],
+        dtype=np.uint64,
+    ) & MASK32
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash index. `num_perm` hash functions are split into `bands`
+    LSH bands; texts sharing any band bucket are compared on their full
+    signatures and count as duplicates when the estimated Jaccard similarity of
+    their shingle sets is at least `threshold`. Texts with fewer than
+    `min_words` words are never matched.
+    """
+
+    def __init__(self, threshold=0.8, shingle_size=5, num_perm=64, bands=16, min_words=0, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_words = min_words
+        self.signatures = {}
+        self.buckets = [{} for _ in range(bands)]
+
+    def signature(self, text):
+        h = shingles(text, self.shingle_size)
+        if not len(h):
+            return None
+        return ((np.outer(h, self.a) + self.b) % PRIME).min(axis=0)
+
+    def _band_keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, text):
+        """
+        Return the key of an indexed near-duplicate of `text`, or None after
+        indexing `text` under `key` as a new representative.
+        """
+        if len(WORD_RE.findall(text)) < max(1, self.min_words):
+            return None
+        sig = self.signature(text)
+        if sig is None:
+            return None
+        band_keys = self._band_keys(sig)
+        seen = set()
+        for band, bk in zip(self.buckets, band_keys):
+            for other in band.get(bk, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                if np.mean(self.signatures[other] == sig) >= self.threshold:
+                    return other
+        self.signatures[key] = sig
+        for band, bk in zip(self.buckets, band_keys):
+            band.setdefault(bk, []).append(key)
+        return None
+
+    def __len__(self):
+        return len(self.signatures)
@@ -0,0 +1,149 @@
+# pipeline.py
+# End-to-end pipeline (fetch -> extract -> timeline) as a stream of progress events.
+from config import MAX_ARTICLES
+from candidates import CandidateBatch
+from event_store import get_event_store
+from fetch_articles import canonical_url, search_newsapi, iter_full_text
+from process_articles import stream_candidates
+from timeline_builder import stream_timeline, sort_timeline, iter_cluster_summaries
+
+
+class PipelineError(Exception):
+    """A pipeline stage failed; `stage` names it for the UI."""
+
+    def __init__(self, stage, error):
+        super().__init__(f"Error {stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def stream_pipeline(query, max_articles=MAX_ARTICLES):
+    """
+    Run the pipeline and yield (event, payload) as results become available:
+      ("articles", [article, ...])     a micro-batch of enriched articles
+      ("candidates", CandidateBatch)   the candidates extracted from that batch
+      ("entry", timeline_entry)        one summarized milestone (completion order)
+    Articles go into candidate extraction as their downloads finish, and each
+    timeline entry is yielded as soon as its LLM summary returns.
+    """
+    try:
+        raw = search_newsapi(query, max_articles)
+    except Exception as e:
+        raise PipelineError("fetching articles", e)
+
+    batches = []
+    try:
+        arriving = (art for _, art in iter_full_text(raw))
+        for arts, cands in stream_candidates(arriving):
+            batches.append(cands)
+            yield "articles", arts
+            yield "candidates", cands
+    except Exception as e:
+        raise PipelineError("processing articles", e)
+
+    try:
+        for entry in stream_timeline(batches):
+            yield "entry", entry
+    except Exception as e:
+        raise PipelineError("building timeline", e)
+
+
+def new_articles(tracked, query, max_articles):
+    """
+    Up to `max_articles` articles published since the tracked event's last
+    update and not processed before, newest first. Pages back in time (NewsAPI
+    returns the newest matches first) past articles already processed.
+    Returns (articles, covered); covered is False when older unprocessed
+    articles may remain in the span.
+    """
+    new, seen, until = [], set(), None
+    while True:
+        found = search_newsapi(query, max_articles, since=tracked.last_published_at, until=until)
+        for a in found:
+            url = canonical_url(a.get("url"))
+            if tracked.is_new(a) and url not in seen:
+                seen.add(url)
+                new.append(a)
+        if len(found) < max_articles:
+            return new[:max_articles], len(new) <= max_articles
+        if len(new) >= max_articles:
+            return new[:max_articles], False
+        oldest = min((a["published_at"] for a in found if a.get("published_at")), default=None)
+        if oldest is None or (until is not None and oldest >= until):
+            # no way further back (e.g. more matches than max_articles at one timestamp)
+            return new, False
+        until = oldest
+
+
+def stream_update(query, max_articles=MAX_ARTICLES, store=None):
+    """
+    Incremental variant of stream_pipeline for a tracked event (same events).
+    Only articles published since the last update (and not processed before)
+    are fetched and extracted; their candidates join existing clusters or form
+    new ones, and only clusters whose membership changed (or whose summary
+    failed last time) go back to the LLM. Unchanged milestones are yielded
+    first, straight from the store. State is saved once the update completes.
+    When more than `max_articles` new articles were published, the newest are
+    processed and the watermark stays put, so later updates work back through
+    the rest.
+    """
+    store = store or get_event_store()
+    with store.lock(query):
+        tracked = store.load(query)
+        try:
+            raw, covered = new_articles(tracked, query, max_articles)
+        except Exception as e:
+            raise PipelineError("fetching articles", e)
+
+        articles, batches = [], []
+        try:
+            arriving = (art for _, art in iter_full_text(raw))
+            for arts, cands in stream_candidates(arriving):
+                articles.extend(arts)
+                batches.append(cands)
+                yield "articles", arts
+                yield "candidates", cands
+        except Exception as e:
+            raise PipelineError("processing articles", e)
+
+        try:
+            changed = set(tracked.assign(CandidateBatch.concat(batches))) | set(tracked.stale_clusters())
+            for j, cl in enumerate(tracked.clusters):
+                if j not in changed and cl["entry"] is not None:
+                    yield "entry", cl["entry"]
+            todo = sorted(changed)
+            clusters = [tracked.clusters[j]["members"] for j in todo]
+            for i, entry in iter_cluster_summaries(clusters):
+                tracked.clusters[todo[i]]["entry"] = entry
+                yield "entry", entry
+        except Exception as e:
+            raise PipelineError("building timeline", e)
+
+        tracked.add_articles(articles, advance=covered)
+        store.save(tracked, changed=todo)
+
+
+def collect(events):
+    """
+    Drain a pipeline event stream into {"articles", "candidates", "timeline"}:
+    candidates as one CandidateBatch, the timeline sorted by date.
+    """
+    articles, batches, entries = [], [], []
+    for event, payload in events:
+        if event == "articles":
+            articles.extend(payload)
+        elif event == "candidates":
+            batches.append(payload)
+        elif event == "entry":
+            entries.append(payload)
+    return {"articles": articles, "candidates": CandidateBatch.concat(batches), "timeline": sort_timeline(entries)}
+
+
+def run_pipeline(query, max_articles=MAX_ARTICLES):
+    """Blocking wrapper: returns {"articles", "candidates", "timeline"} with the timeline sorted by date."""
+    return collect(stream_pipeline(query, max_articles))
+
+
+def run_update(query, max_articles=MAX_ARTICLES, store=None):
+    """Blocking wrapper around stream_update; "articles" / "candidates" hold only this update's additions."""
+    return collect(stream_update(query, max_articles, store=store))
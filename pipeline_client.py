@@ -0,0 +1,63 @@
+# pipeline_client.py
+# Client for pipeline_server.py: submit a query and poll it, with the same progress events as
+# pipeline.stream_pipeline so callers can switch between in-process and server runs.
+import time
+import requests
+from config import MAX_ARTICLES, PIPELINE_SERVER_URL, PIPELINE_POLL_INTERVAL
+from pipeline import PipelineError
+
+_session = requests.Session()
+
+
+def _call(method, url, **kwargs):
+    try:
+        resp = _session.request(method, url, timeout=30, **kwargs)
+    except requests.RequestException as e:
+        raise PipelineError("contacting pipeline server", e)
+    if resp.status_code >= 400 and resp.status_code != 409:
+        raise PipelineError("contacting pipeline server", f"HTTP {resp.status_code}: {resp.text[:200]}")
+    return resp.json()
+
+
+def submit(query, max_articles=MAX_ARTICLES, incremental=False, server=PIPELINE_SERVER_URL):
+    """Queue a job (or join the identical one already in flight); returns its status."""
+    return _call("POST", f"{server.rstrip('/')}/jobs",
+                 json={"query": query, "max_articles": max_articles, "incremental": incremental})
+
+
+def status(job_id, server=PIPELINE_SERVER_URL, **offsets):
+    return _call("GET", f"{server.rstrip('/')}/jobs/{job_id}", params=offsets)
+
+
+def result(job_id, server=PIPELINE_SERVER_URL):
+    return _call("GET", f"{server.rstrip('/')}/jobs/{job_id}/result")
+
+
+def stream_job(query, max_articles=MAX_ARTICLES, incremental=False, server=PIPELINE_SERVER_URL,
+               poll_interval=PIPELINE_POLL_INTERVAL):
+    """
+    Run a query on the server and yield (event, payload) while polling it:
+      ("articles", [article, ...])       title / url / source / published_at only
+      ("candidates", [candidate, ...])   sentence / date_mentioned / article_source / article_url
+      ("entry", timeline_entry)          one summarized milestone (completion order)
+      ("metrics", snapshot)              once, when the job is done (the job's spans and counters)
+    Raises PipelineError when the job fails or the server can't be reached.
+    """
+    job = submit(query, max_articles, incremental, server)
+    seen = {"articles_from": 0, "candidates_from": 0, "entries_from": 0}
+    while True:
+        st = status(job["id"], server, **seen)
+        for event, field, offset in (("articles", "articles", "articles_from"),
+                                     ("candidates", "candidates", "candidates_from")):
+            if st[field]:
+                seen[offset] += len(st[field])
+                yield event, st[field]
+        for entry in st["entries"]:
+            seen["entries_from"] += 1
+            yield "entry", entry
+        if st["state"] == "error":
+            raise PipelineError(st["stage"], st["error"])
+        if st["state"] == "done":
+            yield "metrics", st["metrics"]
+            return
+        time.sleep(poll_interval)
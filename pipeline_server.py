@@ -0,0 +1,303 @@
+# pipeline_server.py
+# Long-running pipeline service: a job queue drained by a pool of worker threads that share one
+# copy of the models, with identical queries that are already queued or running merged into one job.
+#
+#   python pipeline_server.py --port 8600 --workers 4
+#
+#   POST /jobs                {"query": "...", "max_articles": 12, "incremental": false} -> job status
+#   GET  /jobs/<id>           status, progress and what arrived since ?articles_from=&candidates_from=&entries_from=
+#   GET  /jobs/<id>/result    articles and the sorted timeline (409 until the job is done)
+#   GET  /health              workers, queue depth, job counts and server-wide metrics
+#
+# app.py becomes a client of this server when PIPELINE_SERVER_URL is set (see pipeline_client.py).
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import instrumentation
+import models
+from config import MAX_ARTICLES, PIPELINE_JOB_TTL, PIPELINE_MAX_ARTICLES, PIPELINE_SERVER_PORT, PIPELINE_WORKERS
+from event_store import query_key
+from pipeline import stream_pipeline, stream_update, PipelineError
+from timeline_builder import sort_timeline
+
+# article / candidate fields sent to clients (full text and embeddings stay on the server)
+ARTICLE_FIELDS = ("title", "url", "source", "published_at")
+CANDIDATE_FIELDS = ("sentence", "date_mentioned", "article_source", "article_url")
+EXPIRE_INTERVAL = 60   # seconds an idle worker waits before dropping expired jobs
+
+
+class Job:
+    """One pipeline run. The worker appends events; HTTP threads read consistent copies under the lock."""
+
+    def __init__(self, query, max_articles, incremental=False):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.max_articles = max_articles
+        self.incremental = incremental
+        self.key = (query_key(query), max_articles, incremental)
+        self.state = "queued"      # queued | running | done | error
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.articles = []
+        self.candidates = []
+        self.entries = []
+        self.timings = {}
+        self.stage = None
+        self.error = None
+        self.metrics = None
+        self.recorder = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.state in ("done", "error")
+
+    def start(self):
+        with self._lock:
+            self.state = "running"
+            self.started_at = time.time()
+
+    def add(self, event, payload):
+        now = round(time.time() - self.started_at, 3)
+        with self._lock:
+            if event == "articles":
+                self.articles.extend({k: a.get(k) for k in ARTICLE_FIELDS} for a in payload)
+                self.timings.setdefault("first_article_s", now)
+            elif event == "candidates":
+                self.candidates.extend({k: c[k] for k in CANDIDATE_FIELDS} for c in payload)
+                self.timings["extraction_done_s"] = now
+            elif event == "entry":
+                self.entries.append(payload)
+                self.timings.setdefault("first_entry_s", now)
+
+    def finish(self, stage=None, error=None):
+        with self._lock:
+            self.finished_at = time.time()
+            self.timings["queued_s"] = round(self.started_at - self.created_at, 3)
+            self.timings["total_s"] = round(self.finished_at - self.started_at, 3)
+            self.metrics = self.recorder.snapshot() if self.recorder else None
+            self.stage = stage
+            self.error = error
+            self.state = "done" if stage is None else "error"
+
+    def status(self, articles_from=0, candidates_from=0, entries_from=0):
+        with self._lock:
+            return {
+                "id": self.id,
+                "query": self.query,
+                "max_articles": self.max_articles,
+                "incremental": self.incremental,
+                "state": self.state,
+                "n_articles": len(self.articles),
+                "n_candidates": len(self.candidates),
+                "n_entries": len(self.entries),
+                "articles": self.articles[articles_from:],
+                "candidates": self.candidates[candidates_from:],
+                "entries": self.entries[entries_from:],
+                "timings": dict(self.timings),
+                "stage": self.stage,
+                "error": self.error,
+                "metrics": self.metrics,
+            }
+
+    def result(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "query": self.query,
+                "articles": list(self.articles),
+                "n_candidates": len(self.candidates),
+                "timeline": sort_timeline(self.entries),
+                "timings": dict(self.timings),
+                "metrics": self.metrics,
+            }
+
+
+class JobQueue:
+    """
+    FIFO of pipeline jobs run by `workers` threads. All workers use the
+    process-wide models (models.using serializes inference), so adding
+    workers overlaps network and LLM waits rather than loading more models.
+    Submitting a query that is already queued or running returns that job.
+    """
+
+    def __init__(self, workers=PIPELINE_WORKERS, job_ttl=PIPELINE_JOB_TTL):
+        self.workers = max(1, workers)
+        self.job_ttl = job_ttl
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"pipeline-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, query, max_articles=MAX_ARTICLES, incremental=False):
+        """Returns (job, created); created is False when an identical job was already in flight."""
+        job = Job(query, max_articles, incremental)
+        with self._lock:
+            self._expire()
+            running = self._inflight.get(job.key)
+            if running is not None:
+                instrumentation.incr("server_jobs_deduplicated")
+                return running, False
+            self._jobs[job.id] = job
+            self._inflight[job.key] = job
+        instrumentation.incr("server_jobs_submitted")
+        self._queue.put(job)
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def _expire(self):
+        """Drop finished jobs older than job_ttl (caller holds the lock)."""
+        now = time.time()
+        for job_id in [j.id for j in self._jobs.values() if j.finished and now - j.finished_at > self.job_ttl]:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=EXPIRE_INTERVAL)
+            except queue.Empty:
+                # idle: still release finished jobs' results once they expire
+                with self._lock:
+                    self._expire()
+                continue
+            try:
+                self.run(job)
+            finally:
+                with self._lock:
+                    if self._inflight.get(job.key) is job:
+                        del self._inflight[job.key]
+                self._queue.task_done()
+
+    def run(self, job):
+        # per-job spans and counters (also summed into the server-wide recorder behind /health)
+        with instrumentation.recording() as job.recorder:
+            job.start()
+            events = stream_update if job.incremental else stream_pipeline
+            try:
+                for event, payload in events(job.query, job.max_articles):
+                    job.add(event, payload)
+            except PipelineError as e:
+                job.finish(e.stage, str(e.error))
+            except Exception as e:
+                job.finish("running pipeline", str(e))
+            else:
+                job.finish()
+
+    def stats(self):
+        with self._lock:
+            self._expire()
+            states = [j.state for j in self._jobs.values()]
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "jobs": {s: states.count(s) for s in ("queued", "running", "done", "error")},
+            "models_loaded": [name for name in models.LOADERS if models.is_loaded(name)],
+            "metrics": instrumentation.snapshot(),
+        }
+
+
+class Handler(BaseHTTPRequestHandler):
+    jobs = None   # set by make_server
+
+    def _send(self, status, body):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            query = str(body["query"]).strip()
+            max_articles = int(body.get("max_articles", MAX_ARTICLES))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send(400, {"error": f"bad request: {e}"})
+        if not query:
+            return self._send(400, {"error": "bad request: empty query"})
+        if not 1 <= max_articles <= PIPELINE_MAX_ARTICLES:
+            return self._send(400, {"error": f"bad request: max_articles must be between 1 and {PIPELINE_MAX_ARTICLES}"})
+        job, created = self.jobs.submit(query, max_articles, bool(body.get("incremental")))
+        self._send(202 if created else 200, job.status())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            return self._send(200, self.jobs.stats())
+        if len(parts) not in (2, 3) or parts[0] != "jobs" or (len(parts) == 3 and parts[2] != "result"):
+            return self._send(404, {"error": "not found"})
+        job = self.jobs.get(parts[1])
+        if job is None:
+            return self._send(404, {"error": "unknown or expired job"})
+        if len(parts) == 3:
+            if not job.finished:
+                return self._send(409, job.status())
+            return self._send(200, job.result())
+        params = parse_qs(url.query)
+        try:
+            offsets = {k: int(params.get(k, ["0"])[0]) for k in ("articles_from", "candidates_from", "entries_from")}
+        except ValueError as e:
+            return self._send(400, {"error": f"bad request: {e}"})
+        if min(offsets.values()) < 0:
+            return self._send(400, {"error": "bad request: negative offset"})
+        self._send(200, job.status(**offsets))
+
+    def log_message(self, fmt, *args):
+        # polling is chatty; only errors go to stderr
+        pass
+
+
+def make_server(port=PIPELINE_SERVER_PORT, workers=PIPELINE_WORKERS, host="127.0.0.1"):
+    jobs = JobQueue(workers)
+    handler = type("PipelineHandler", (Handler,), {"jobs": jobs})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, jobs
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve the news pipeline as a job queue over HTTP.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=PIPELINE_SERVER_PORT)
+    ap.add_argument("--workers", type=int, default=PIPELINE_WORKERS, help="jobs run concurrently")
+    args = ap.parse_args(argv)
+
+    # load spaCy + SentenceTransformer once; every worker thread shares them
+    models.warm_up(background=False)
+    server, jobs = make_server(args.port, args.workers, args.host)
+    jobs.start()
+    print(f"pipeline server on http://{args.host}:{server.server_address[1]} with {jobs.workers} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,72 +1,222 @@
 # process_articles.py
-import spacy
-from dateparser import parse as dateparse
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from datetime import datetime
-from typing import List, Dict
-from config import EMBEDDING_MODEL
+from typing import List, Dict, Iterable
+from config import EMBEDDING_MODEL, EMBEDDING_CACHE_ENABLED, SPACY_BATCH_SIZE, SPACY_N_PROCESS, STREAM_ARTICLES_PER_BATCH
+from config import DEDUP_ENABLED, DEDUP_ARTICLE_THRESHOLD, DEDUP_ARTICLE_MIN_WORDS, DEDUP_SENTENCE_THRESHOLD
+from date_resolver import DateResolver
+from embedding_cache import EmbeddingCache
+from embedding_engine import get_engine
+from models import get_nlp, get_embed_model, using
+from near_duplicates import NearDuplicateIndex
+from candidates import ArticleTable, CandidateBatch
+import instrumentation
 from tqdm import tqdm
 
-import spacy
+# spaCy and the SentenceTransformer are loaded lazily by models.py on first use
+date_resolver = DateResolver()
+embedding_cache = EmbeddingCache(EMBEDDING_MODEL) if EMBEDDING_CACHE_ENABLED else None
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    import spacy.cli
-    spacy.cli.download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+def sentences_with_dates(doc):
+    """Yield (sentence, [DATE entity texts]) for every usable sentence of an already-parsed Doc."""
+    for sent in doc.sents:
+        s = sent.text.strip()
+        if len(s) <= 20:
+            continue
+        yield s, [ent.text for ent in sent.ents if ent.label_ == "DATE"]
 
-embed_model = SentenceTransformer(EMBEDDING_MODEL)
+def __getattr__(name):
+    # backwards compatible `process_articles.nlp` / `process_articles.embed_model`
+    if name == "nlp":
+        return get_nlp()
+    if name == "embed_model":
+        return get_embed_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def split_sentences(text):
-    doc = nlp(text)
-    return [sent.text.strip() for sent in doc.sents if len(sent.text.strip()) > 20]
+    with using("nlp"):
+        doc = get_nlp()(text)
+    return [s for s, _ in sentences_with_dates(doc)]
 
-def extract_date_from_text(text):
-    # Try to parse explicit date mentions in a sentence
-    parsed = dateparse(text, settings={'PREFER_DATES_FROM': 'past'})
-    if parsed:
-        return parsed.date().isoformat()
-    return None
+# per-run counter for each DateResolver outcome
+DATE_COUNTERS = {"parse": "date_parses", "skipped": "date_skipped", "cache_hit": "date_cache_hits"}
 
-def build_candidates(articles: List[Dict]):
+def extract_date_from_text(text, published_at=None, entity=False):
+    # Try to parse explicit date mentions in a sentence (relative ones against the publish date)
+    result, outcome = date_resolver.resolve_outcome(text, published_at, entity)
+    instrumentation.incr(DATE_COUNTERS[outcome])
+    return result
+
+def embed_sentences(sentences):
+    """
+    Return one L2-normalized float32 vector per sentence (see embedding_engine),
+    encoding only sentences missing from the embedding cache.
+    """
+    def encode(batch):
+        instrumentation.incr("sentences_encoded", len(batch))
+        with using("embed_model"):
+            return get_engine().encode(batch)
+    with instrumentation.span("nlp.embed"):
+        if embedding_cache is None:
+            return list(np.asarray(encode(sentences), dtype=np.float32))
+        vectors, hits = embedding_cache.encode(sentences, encode)
+        instrumentation.incr("embedding_cache_hits", hits)
+        return vectors
+
+def article_text(art):
+    return art.get("content", "") or art.get("raw_content", "") or ""
+
+EVENT_KEYWORDS = {"launch", "announce", "launched", "land", "landed", "release", "rolled out", "reported", "confirmed", "said", "claimed"}
+
+def extract_candidates(articles: List[Dict], batch_size: int = SPACY_BATCH_SIZE, n_process: int = SPACY_N_PROCESS):
     """
     For each article, split into sentences and mark any sentence with
-    a date mention or event-word as a candidate.
+    a date mention or event-word as a candidate (no embeddings yet).
+    Articles go through spaCy once, batched with nlp.pipe.
     """
-    candidates = []
-    event_keywords = {"launch", "announce", "launched", "land", "landed", "release", "rolled out", "reported", "confirmed", "said", "claimed"}
-    for art in articles:
-        sentences = split_sentences(art.get("content", "") or art.get("raw_content", ""))
-        for s in sentences:
+    texts = [article_text(art) for art in articles]
+    # single batched pass: sentence boundaries and DATE entities come from the same Doc
+    with using("nlp"), instrumentation.span("nlp.spacy"):
+        docs = list(get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process))
+    return candidates_from_docs(articles, docs)
+
+def candidates_from_docs(articles: List[Dict], docs):
+    """Candidate selection and date resolution over already-parsed Docs (one per article); returns a CandidateBatch."""
+    with instrumentation.span("nlp.dates"):
+        candidates = _select_candidates(articles, docs)
+    instrumentation.incr("candidates", len(candidates))
+    return candidates
+
+def _select_candidates(articles, docs):
+    table = ArticleTable()
+    sentences, dates, index = [], [], []
+    for art, doc in zip(articles, docs):
+        row = None
+        for s, date_ents in sentences_with_dates(doc):
             lower = s.lower()
-            has_keyword = any(k in lower for k in event_keywords)
+            has_keyword = any(k in lower for k in EVENT_KEYWORDS)
             date_mentioned = None
-            # try spaCy entities for DATE as well
-            doc = nlp(s)
-            for ent in doc.ents:
-                if ent.label_ == "DATE":
-                    maybe = extract_date_from_text(ent.text)
-                    if maybe:
-                        date_mentioned = maybe
-                        break
+            for ent_text in date_ents:
+                maybe = extract_date_from_text(ent_text, art.get("published_at"), entity=True)
+                if maybe:
+                    date_mentioned = maybe
+                    break
             # attempt parsing entire sentence if nothing found
             if not date_mentioned:
-                date_mentioned = extract_date_from_text(s)
+                date_mentioned = extract_date_from_text(s, art.get("published_at"))
             if has_keyword or date_mentioned:
-                candidates.append({
-                    "article_url": art.get("url"),
-                    "article_title": art.get("title"),
-                    "article_source": art.get("source"),
-                    "article_published": art.get("published_at"),
-                    "sentence": s,
-                    "date_mentioned": date_mentioned
-                })
-    # compute embeddings
-    if candidates:
-        sentences = [c["sentence"] for c in candidates]
-        embeddings = embed_model.encode(sentences, show_progress_bar=True)
-        for i, c in enumerate(candidates):
-            c["embedding"] = embeddings[i].tolist()
+                if row is None:
+                    row = table.add_article(art)
+                sentences.append(s)
+                dates.append(date_mentioned)
+                index.append(row)
+    return CandidateBatch(table, sentences, dates, index)
+
+def embed_candidates(candidates):
+    """Attach the (n, d) float32 embedding matrix to a CandidateBatch (old-style dict lists are converted)."""
+    candidates = CandidateBatch.from_dicts(candidates)
+    if len(candidates):
+        candidates.embeddings = np.vstack(embed_sentences(candidates.sentences)).astype(np.float32, copy=False)
     return candidates
+
+# candidate fields that identify one copy of a sentence (kept for every collapsed duplicate)
+PROVENANCE_FIELDS = ("sentence", "article_url", "article_title", "article_source", "article_published", "date_mentioned")
+
+class Deduplicator:
+    """
+    Collapses near-duplicate articles (wire copies) and candidate sentences
+    before spaCy and embedding. The first copy is kept as the representative;
+    every other copy is recorded in the representative candidate's
+    "duplicates" list, so timeline entries still credit all outlets.
+    State persists across calls, so streamed batches are deduplicated against
+    everything seen so far (a late copy is attached to candidates already emitted).
+    """
+
+    def __init__(self, enabled=DEDUP_ENABLED):
+        self.enabled = enabled
+        self.articles = NearDuplicateIndex(DEDUP_ARTICLE_THRESHOLD, shingle_size=5, min_words=DEDUP_ARTICLE_MIN_WORDS)
+        self.sentences = NearDuplicateIndex(DEDUP_SENTENCE_THRESHOLD, shingle_size=3)
+        self._article_copies = {}       # representative article key -> provenance of its copies
+        self._article_candidates = {}   # representative article key -> [(duplicates list, sentence, date)] of its candidates
+        self._article_keys = {}         # representative article url -> key
+        self._sentence_reps = []        # sentence key (index) -> duplicates list of the representative row
+
+    def unique_articles(self, articles):
+        """Articles whose text is not a near-duplicate of one seen before."""
+        if not self.enabled:
+            return list(articles)
+        unique = []
+        for art in articles:
+            key = len(self._article_copies)
+            rep = self.articles.add(key, article_text(art))
+            if rep is None:
+                if art.get("url"):
+                    self._article_keys[art["url"]] = key
+                self._article_copies[key] = []
+                self._article_candidates[key] = []
+                unique.append(art)
+                continue
+            instrumentation.incr("duplicate_articles")
+            copy = {"article_url": art.get("url"), "article_title": art.get("title"),
+                    "article_source": art.get("source"), "article_published": art.get("published_at")}
+            self._article_copies[rep].append(copy)
+            for dups, sentence, date_mentioned in self._article_candidates[rep]:
+                dups.append(dict(copy, sentence=sentence, date_mentioned=date_mentioned))
+        return unique
+
+    def unique_candidates(self, candidates):
+        """Rows of a CandidateBatch whose sentence is not a near-duplicate of one seen before; copies go into "duplicates"."""
+        if not self.enabled:
+            return candidates
+        keep = []
+        for i, row in enumerate(candidates):
+            sentence, date_mentioned = row["sentence"], row["date_mentioned"]
+            dups = candidates.duplicates[i]
+            # copies of the whole article share every sentence of this one
+            key = self._article_keys.get(row["article_url"])
+            if key is not None:
+                dups.extend(dict(copy, sentence=sentence, date_mentioned=date_mentioned)
+                            for copy in self._article_copies[key])
+            rep = self.sentences.add(len(self._sentence_reps), sentence)
+            if rep is None:
+                self._sentence_reps.append(dups)
+                keep.append(i)
+                target = dups
+            else:
+                instrumentation.incr("duplicate_sentences")
+                target = self._sentence_reps[rep]
+                target.append({k: row[k] for k in PROVENANCE_FIELDS})
+                target.extend(dups)
+            if key is not None:
+                self._article_candidates[key].append((target, sentence, date_mentioned))
+        # take() shares each row's duplicates list, so late copies still reach emitted rows
+        return candidates.take(keep)
+
+def build_candidates(articles: List[Dict], batch_size: int = SPACY_BATCH_SIZE, n_process: int = SPACY_N_PROCESS,
+                     dedup: Deduplicator = None):
+    """
+    For each article, split into sentences and mark any sentence with
+    a date mention or event-word as a candidate, then embed the candidates.
+    Near-duplicate articles are dropped before spaCy and near-duplicate
+    sentences before embedding (see Deduplicator).
+    """
+    dedup = dedup or Deduplicator()
+    articles = dedup.unique_articles(articles)
+    candidates = extract_candidates(articles, batch_size=batch_size, n_process=n_process)
+    return embed_candidates(dedup.unique_candidates(candidates))
+
+def stream_candidates(articles: Iterable[Dict], articles_per_batch: int = STREAM_ARTICLES_PER_BATCH):
+    """
+    Consume articles as they arrive (e.g. from fetch_articles.stream_articles) and
+    yield (articles, candidates) every `articles_per_batch` articles.
+    Duplicates are detected across all batches of the stream.
+    """
+    dedup = Deduplicator()
+    pending = []
+    for art in articles:
+        pending.append(art)
+        if len(pending) >= articles_per_batch:
+            yield pending, build_candidates(pending, dedup=dedup)
+            pending = []
+    if pending:
+        yield pending, build_candidates(pending, dedup=dedup)
@@ -0,0 +1,65 @@
+# Offline checks of build_timeline against FakeLLMBackend: output order, entry schema,
+# retries on 429/503 and the per-cluster timeout fallback.
+import numpy as np
+import pytest
+
+import llm_client
+import timeline_builder
+from llm_client import FakeLLMBackend, TokenBucket
+from timeline_builder import build_timeline
+
+ENTRY_KEYS = {"date", "milestone", "confidence", "sources", "notes", "supporting_sentences"}
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    # no summary cache (a hit would skip the backend) and no 60/min rate limit
+    monkeypatch.setattr(timeline_builder, "get_summary_cache", lambda: None)
+    monkeypatch.setattr(llm_client, "_bucket", TokenBucket(1000.0, capacity=100))
+
+
+def candidate(i, date, source, published="2025-04-01T00:00:00Z"):
+    # orthogonal unit vectors: every candidate ends up in its own cluster
+    embedding = np.zeros(8, dtype=np.float32)
+    embedding[i] = 1.0
+    return {
+        "sentence": f"Milestone {i} happened on {date or 'some day'}.",
+        "date_mentioned": date,
+        "article_url": f"https://example.com/{i}",
+        "article_title": f"Article {i}",
+        "article_source": source,
+        "article_published": published,
+        "embedding": embedding,
+    }
+
+
+def candidates():
+    return [candidate(0, "2025-03-10", "A"), candidate(1, None, "B", published=None),
+            candidate(2, "2024-11-02", "C"), candidate(3, "2025-01-15", "A")]
+
+
+def test_build_timeline_retries_and_keeps_order():
+    backend = FakeLLMBackend(fail_statuses=[429, 503], latency=0.01)
+    timeline = build_timeline(candidates(), backend=backend, timeout=30)
+
+    assert [e["date"] for e in timeline] == ["2024-11-02", "2025-01-15", "2025-03-10", None]
+    for entry in timeline:
+        assert set(entry) == ENTRY_KEYS
+        assert not entry["notes"]
+        assert len(entry["supporting_sentences"]) == 1
+        assert set(entry["supporting_sentences"][0]) == {"sentence", "source", "url"}
+    assert timeline[0]["milestone"] == "Milestone 2 happened on 2024-11-02."
+    # both failures were retried: one extra call each
+    assert backend.calls == len(timeline) + 2
+
+
+def test_build_timeline_falls_back_on_timeout():
+    backend = FakeLLMBackend(latency=1.0)
+    timeline = build_timeline(candidates(), backend=backend, timeout=0.1)
+
+    assert [e["date"] for e in timeline] == ["2024-11-02", "2025-01-15", "2025-03-10", None]
+    for entry in timeline:
+        assert set(entry) == ENTRY_KEYS
+        assert entry["notes"].startswith("LLM error:")
+        assert entry["confidence"] == 0.4
+        assert entry["milestone"] == entry["supporting_sentences"][0]["sentence"]
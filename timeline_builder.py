@@ -1,137 +1,245 @@
 # timeline_builder.py
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering
-from collections import defaultdict, Counter
-import openai
+from collections import Counter
 import json
-from config import OPENAI_API_KEY, LLM_MODEL
+import time
+import os
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import CLUSTER_BACKEND, LLM_CONCURRENCY, LLM_TIMEOUT, LLM_MODEL
+from config import CACHE_DIR, SUMMARY_CACHE_ENABLED, SUMMARY_CACHE_MAX_MB
+from config import EVIDENCE_TOKEN_BUDGET, EVIDENCE_MMR_LAMBDA, EVIDENCE_SOURCE_PENALTY
+from candidates import CandidateBatch, NO_DATE, date_ordinal
+from clustering import cluster_labels
+from disk_cache import DiskCache
+import instrumentation
+from evidence import select_evidence
+from llm_client import complete_with_retries, estimate_tokens, get_backend
 from dateutil.parser import parse as parse_dt
 
-openai.api_key = OPENAI_API_KEY
+SYSTEM_PROMPT = "You output strict factual summaries based only on input text. Do not hallucinate."
+# bump whenever SYSTEM_PROMPT or build_prompt changes so cached summaries are not reused
+PROMPT_VERSION = "3"
 
-def cluster_candidates(candidates, distance_threshold=1.05):
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache():
+    """Shared on-disk cache of successful LLM cluster summaries (None when disabled)."""
+    global _summary_cache
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            _summary_cache = DiskCache(
+                os.path.join(CACHE_DIR, "summaries.sqlite"),
+                table="summaries",
+                max_bytes=int(SUMMARY_CACHE_MAX_MB * 1024 * 1024),
+            )
+    return _summary_cache
+
+def summary_cache_key(cluster, candidate_date, model=LLM_MODEL):
+    # every copy, not just the representatives: which near-duplicate represents a
+    # group depends on download completion order, the group's content doesn't
+    payload = json.dumps({
+        "sentences": sorted(c["sentence"] for c in with_duplicates(cluster)),
+        "date": candidate_date,
+        "model": model,
+        "prompt_version": PROMPT_VERSION,
+        "evidence": [EVIDENCE_TOKEN_BUDGET, EVIDENCE_MMR_LAMBDA, EVIDENCE_SOURCE_PENALTY],
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def cluster_candidates(candidates, distance_threshold=1.05, backend=CLUSTER_BACKEND):
     """
-    Agglomerative clustering over embeddings.
+    Threshold clustering over embeddings (see clustering.py for backends).
     Adjust distance_threshold for coarser/finer clusters.
+    Takes a CandidateBatch (or a list of candidate dicts) and returns one
+    CandidateBatch per cluster, in order of first appearance.
     """
-    if not candidates:
+    if not len(candidates):
         return []
-    X = np.array([c["embedding"] for c in candidates])
-    # choose n_clusters by heuristic: allow clustering by distance threshold
-    clustering = AgglomerativeClustering(n_clusters=None, distance_threshold=distance_threshold, linkage="average")
-    labels = clustering.fit_predict(X)
-    clustered = defaultdict(list)
-    for lab, c in zip(labels, candidates):
-        clustered[int(lab)].append(c)
-    clusters = list(clustered.values())
+    candidates = CandidateBatch.from_dicts(candidates)
+    with instrumentation.span("timeline.cluster"):
+        # choose n_clusters by heuristic: allow clustering by distance threshold
+        labels = np.asarray(cluster_labels(candidates.embeddings, distance_threshold, backend=backend))
+        _, first = np.unique(labels, return_index=True)
+        order = labels[np.sort(first)]
+        clusters = [candidates.take(np.flatnonzero(labels == lab)) for lab in order]
+    instrumentation.incr("clusters", len(clusters))
     return clusters
 
+def with_duplicates(cluster):
+    """Every copy of the cluster's sentences: each candidate followed by the near-duplicates collapsed into it."""
+    for c in cluster:
+        yield c
+        yield from c.get("duplicates", ())
+
 def canonical_date_for_cluster(cluster):
-    # gather explicit dates mentioned then fallback to article publish dates
-    dates = []
-    weights = []
-    for item in cluster:
-        if item.get("date_mentioned"):
-            try:
-                d = parse_dt(item["date_mentioned"]).date()
-                dates.append(d)
-                weights.append(1.5)  # date mention gets higher weight
-            except Exception:
-                pass
-        # fallback to article publish date
-        try:
-            pub = item.get("article_published")
-            if pub:
-                dpub = parse_dt(pub).date()
-                dates.append(dpub)
-                weights.append(1.0)
-        except Exception:
-            pass
-    if not dates:
+    """
+    Weighted median of the dates mentioned in the cluster (weight 1.5) and the
+    article publish dates (weight 1.0), read from the batch's ordinal columns.
+    Collapsed duplicates still count, so wire copies weigh as before.
+    """
+    batch = CandidateBatch.from_dicts(cluster)
+    mentioned = batch.date_ordinals[batch.date_ordinals != NO_DATE]
+    published = batch.published_ordinals()
+    published = published[published != NO_DATE]
+    extra = [(date_ordinal(d.get(field)), w)
+             for dups in batch.duplicates for d in dups
+             for field, w in (("date_mentioned", 1.5), ("article_published", 1.0))]
+    extra = [(o, w) for o, w in extra if o != NO_DATE]
+    ordinals = np.concatenate([mentioned, published, np.array([o for o, _ in extra], dtype=np.int32)])
+    if not len(ordinals):
         return None
-    # compute weighted median by converting to ordinal
-    ordinals = [d.toordinal() for d in dates]
-    # weighted median
-    sorted_pairs = sorted(zip(ordinals, weights))
-    total_w = sum(weights)
-    cumulative = 0
-    for o, w in sorted_pairs:
-        cumulative += w
-        if cumulative >= total_w / 2:
-            return datetime_from_ordinal(o)
-    # fallback
-    return datetime_from_ordinal(ordinals[int(len(ordinals)/2)])
+    weights = np.concatenate([np.full(len(mentioned), 1.5), np.full(len(published), 1.0), np.array([w for _, w in extra])])
+    order = np.lexsort((weights, ordinals))
+    cumulative = np.cumsum(weights[order])
+    median = int(np.argmax(cumulative >= weights.sum() / 2))
+    return datetime_from_ordinal(ordinals[order][median])
 
 def datetime_from_ordinal(ordv):
     from datetime import date
     d = date.fromordinal(int(ordv))
     return d.isoformat()
 
-def summarize_cluster_with_llm(cluster, candidate_date):
+def support_line(c):
+    line = f"- ({c['article_source']}) \"{c['sentence']}\" (url: {c['article_url']})"
+    also = list(dict.fromkeys(d["article_source"] for d in c.get("duplicates", ()) if d["article_source"]))
+    if also:
+        line += f" [also reported by: {', '.join(also)}]"
+    return line
+
+def build_prompt(cluster, candidate_date, budget=EVIDENCE_TOKEN_BUDGET):
     """
-    Call LLM to create a short milestone sentence and confidence.
-    Prompt contains only supporting quotes and provenance to reduce halluc.
+    Prompt with the cluster's quotes, trimmed to about `budget` tokens of quotes
+    by evidence.select_evidence. Counts the estimated prompt tokens before and
+    after selection (prompt_tokens_full / prompt_tokens_selected).
     """
-    # Prepare prompt
-    supports = []
-    for c in cluster:
-        supports.append(f"- ({c['article_source']}) \"{c['sentence']}\" (url: {c['article_url']})")
+    lines = [support_line(c) for c in cluster]
+    costs = [estimate_tokens(line) + 1 for line in lines]
+    keep = select_evidence(cluster, costs, budget=budget)
+    supports = [lines[i] for i in keep]
+    header = "Supporting quotes:\n"
+    if len(keep) < len(lines):
+        header = f"Supporting quotes ({len(keep)} of {len(lines)}, selected for coverage of sources):\n"
     prompt = (
         "You are a factual summarizer. Given the supporting sentences from news articles below, "
         "produce:\n1) ONE short canonical milestone sentence (10-25 words) strictly based on the supporting quotes.\n"
         "2) a confidence score (0-1) indicating how well supported it is.\n3) list up to 3 sources that best support the milestone.\n"
         "If the supporting quotes contradict each other, indicate 'CONTRADICTION DETECTED' and list the differing claims.\n\n"
-        f"Candidate canonical date: {candidate_date}\n\nSupporting quotes:\n" + "\n".join(supports) + "\n\nRespond in JSON with keys: 'date','milestone','confidence','sources','notes'.\n"
+        f"Candidate canonical date: {candidate_date}\n\n" + header + "\n".join(supports) + "\n\nRespond in JSON with keys: 'date','milestone','confidence','sources','notes'.\n"
     )
-    # LLM call (ChatCompletion)
+    selected = estimate_tokens(prompt)
+    instrumentation.incr("prompt_tokens_selected", selected)
+    instrumentation.incr("prompt_tokens_full", selected + sum(costs) - sum(costs[i] for i in keep))
+    instrumentation.incr("prompt_quotes_dropped", len(lines) - len(keep))
+    return prompt
+
+def fallback_summary(cluster, candidate_date, error):
+    # LLM failed — build a simple fallback summary
+    sentence = cluster[0]["sentence"][:240]
+    return {"date": candidate_date, "milestone": sentence, "confidence": 0.4, "sources": list({c["article_source"] for c in with_duplicates(cluster)})[:3], "notes": f"LLM error: {error}"}
+
+def summarize_cluster_with_llm(cluster, candidate_date, backend=None, timeout=LLM_TIMEOUT, cache="default"):
+    """
+    Call LLM to create a short milestone sentence and confidence.
+    Prompt contains only supporting quotes and provenance to reduce halluc.
+    Rate limited and retried on 429/5xx; after `timeout` seconds the fallback summary is used.
+    Successful answers are cached by cluster content, date, model and PROMPT_VERSION.
+    """
+    backend = backend or get_backend()
+    if cache == "default":
+        cache = get_summary_cache()
+    key = summary_cache_key(cluster, candidate_date, getattr(backend, "model", LLM_MODEL))
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            instrumentation.incr("summary_cache_hits")
+            return cached
+    prompt = build_prompt(cluster, candidate_date)
+    deadline = time.monotonic() + timeout if timeout else None
     try:
-        resp = openai.ChatCompletion.create(
-            model=LLM_MODEL,
-            messages=[
-                {"role": "system", "content": "You output strict factual summaries based only on input text. Do not hallucinate."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.0
-        )
-        text = resp.choices[0].message["content"]
+        with instrumentation.span("timeline.llm"):
+            text = complete_with_retries(
+                [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                backend=backend,
+                deadline=deadline,
+                max_tokens=400,
+                temperature=0.0
+            )
         # try to parse JSON out of the answer
         # LLM is asked to respond in JSON; we try to find the JSON substring
         start = text.find("{")
         end = text.rfind("}") + 1
         if start != -1 and end != -1:
             j = json.loads(text[start:end])
-            return j
         else:
             # fallback: wrap minimal output
-            return {"date": candidate_date, "milestone": text.strip(), "confidence": 0.5, "sources": [], "notes": ""}
+            j = {"date": candidate_date, "milestone": text.strip(), "confidence": 0.5, "sources": [], "notes": ""}
     except Exception as e:
-        # LLM failed — build a simple fallback summary
-        sentence = cluster[0]["sentence"][:240]
-        return {"date": candidate_date, "milestone": sentence, "confidence": 0.4, "sources": list({c["article_source"] for c in cluster})[:3], "notes": f"LLM error: {e}"}
+        # never cached, so the next run retries the LLM
+        instrumentation.incr("llm_fallbacks")
+        return fallback_summary(cluster, candidate_date, e)
+    if cache is not None:
+        cache.set(key, j)
+    return j
+
+def timeline_entry(cl, c_date, summary):
+    return {
+        "date": summary.get("date") or c_date,
+        "milestone": summary.get("milestone"),
+        "confidence": summary.get("confidence"),
+        "sources": summary.get("sources"),
+        "notes": summary.get("notes"),
+        "supporting_sentences": [ {"sentence": s["sentence"], "source": s["article_source"], "url": s["article_url"]} for s in with_duplicates(cl)]
+    }
+
+def iter_cluster_summaries(clusters, max_concurrency=LLM_CONCURRENCY, backend=None, timeout=LLM_TIMEOUT):
+    """
+    Summarize clusters concurrently (at most `max_concurrency` in flight) and
+    yield (cluster index, timeline entry) as each summary completes.
+    """
+    if not clusters:
+        return
+    c_dates = [canonical_date_for_cluster(cl) for cl in clusters]
+    summarize = instrumentation.bind(summarize_cluster_with_llm)
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        futures = {
+            pool.submit(summarize, cl, c_date, backend=backend, timeout=timeout): i
+            for i, (cl, c_date) in enumerate(zip(clusters, c_dates))
+        }
+        for fut in as_completed(futures):
+            i = futures[fut]
+            yield i, timeline_entry(clusters[i], c_dates[i], fut.result())
+
+def sort_timeline(timeline):
+    # sort timeline by date (None goes last)
+    return sorted(timeline, key=lambda x: parse_dt(x["date"]) if x["date"] else datetime.max)
 
-def build_timeline(candidates):
+def build_timeline(candidates, max_concurrency=LLM_CONCURRENCY, backend=None, timeout=LLM_TIMEOUT):
     """
     Full pipeline: cluster -> canonical date -> LLM summarize -> produce timeline entries
+    `candidates` is an embedded CandidateBatch (a list of candidate dicts also works).
+    Clusters are summarized concurrently (at most `max_concurrency` in flight).
     """
     clusters = cluster_candidates(candidates)
-    timeline = []
-    for cl in clusters:
-        c_date = canonical_date_for_cluster(cl)
-        summary = summarize_cluster_with_llm(cl, c_date)
-        timeline.append({
-            "date": summary.get("date") or c_date,
-            "milestone": summary.get("milestone"),
-            "confidence": summary.get("confidence"),
-            "sources": summary.get("sources"),
-            "notes": summary.get("notes"),
-            "supporting_sentences": [ {"sentence": s["sentence"], "source": s["article_source"], "url": s["article_url"]} for s in cl]
-        })
-    # sort timeline by date (None goes last)
-    def parse_none(d):
-        try:
-            return parse_dt(d)
-        except Exception:
-            return None
-    timeline_sorted = sorted(timeline, key=lambda x: parse_dt(x["date"]) if x["date"] else datetime.max)
-    return timeline_sorted
+    entries = dict(iter_cluster_summaries(clusters, max_concurrency=max_concurrency, backend=backend, timeout=timeout))
+    timeline = [entries[i] for i in range(len(clusters))]
+    return sort_timeline(timeline)
+
+def stream_timeline(candidate_batches, max_concurrency=LLM_CONCURRENCY, backend=None, timeout=LLM_TIMEOUT):
+    """
+    Streaming variant of build_timeline: consumes candidate batches as they are
+    produced, clusters once the input ends (cluster membership depends on every
+    candidate) and yields each timeline entry as soon as its summary is ready.
+    Entries arrive in completion order; use sort_timeline for display order.
+    """
+    clusters = cluster_candidates(CandidateBatch.concat(candidate_batches))
+    for _, entry in iter_cluster_summaries(clusters, max_concurrency=max_concurrency, backend=backend, timeout=timeout):
+        yield entry